@@ -1,28 +1,47 @@
 from Game import Game
 from BaseSolver import BaseSolver
+from DistanceHeuristic import DistanceHeuristic
+from NodeTable import NodeTable
+from OpenList import make_open_list
+from array import array
 from typing import Optional
-import heapq
 
 class AStar_Solver(BaseSolver):
     
-    def __init__(self, initial_game: Game, max_nodes=None):
-        super().__init__(initial_game, max_nodes)
+    supports_checkpoint = True
+    
+    def __init__(self, initial_game: Game, max_nodes=None, heuristic="dijkstra", open_list="auto", **options):
+        super().__init__(initial_game, max_nodes, **options)
         self.max_queue_size = 0
+        # "dijkstra": weighted distance maps around filled cells; "manhattan": step count to each end
+        if heuristic not in ("dijkstra", "manhattan"):
+            raise ValueError(f"Unknown heuristic {heuristic!r}, expected 'dijkstra' or 'manhattan'")
+        self.heuristic = heuristic
+        # Static distance maps are built once per puzzle
+        self.distances = DistanceHeuristic(self.initial_game.spec) if heuristic == "dijkstra" else None
+        # "bucket" (Dial's queue, integer weights), "heap" or "auto" (bucket when the weights allow it)
+        self.open_list_kind = open_list
+        self.open_list = make_open_list(open_list, self.initial_game.spec.weights)
+        self._best_f_cost = {}
     
     def solve(self) -> Optional[Game]:
         print("\nStarting A* Search...")
         print(f"Board: {self.initial_game.board.rows}x{self.initial_game.board.cols}, Colors: {len(self.initial_game.board.positions)}")
         
-        self.visited_count = 0
+        self._start_budget()
         self.max_queue_size = 0
         self.solution_found = None
         self.solution_path = []
-        self.parent_map = {}
+        self.solution_moves = []
+        self.nodes = NodeTable()
+        self.open_list = make_open_list(self.open_list_kind, self.initial_game.spec.weights)
         
         self.initial_game.visited_states.clear()
         result = self._astar_search()
         
-        print(f"\nA* Complete: {self.visited_count:,} states visited, max queue: {self.max_queue_size:,}")
+        self._finish_progress()
+        print(f"\nA* Complete: {self.visited_count:,} states visited, max queue: {self.max_queue_size:,}, "
+              f"stale entries skipped: {self.open_list.stale:,}")
         
         if result:
             print("Solution found!")
@@ -32,93 +51,128 @@ class AStar_Solver(BaseSolver):
             return None
     
     def _astar_search(self) -> Optional[Game]:
-        priority_queue = []
-        counter = 0
-        
-        # F(n) = G(n) + H(n)
-        g_cost = self.initial_game.get_total_cost()  # G(n) = actual cost from start
-        h_cost = self._calculate_heuristic(self.initial_game)  # H(n) = estimated cost to goal
-        f_cost = g_cost + h_cost  # F(n) = total estimated cost
-        
-        heapq.heappush(priority_queue, (f_cost, counter, self.initial_game))
-        counter += 1
+        open_list = self.open_list
+        self._frontier = open_list
         
-        self.initial_game.MarkAsVisited()
-        state_hash = self._hash_state(self.initial_game)
-        self.parent_map[state_hash] = None
-        
-        # Track best f_cost for each state
-        best_f_cost = {state_hash: f_cost}
+        if self.resume:
+            self._restore_checkpoint()
+        else:
+            root, root_node = self._root()
+            if root is None:
+                return None
+            
+            # F(n) = G(n) + H(n)
+            g_cost = root.get_total_cost()  # G(n) = actual cost from start
+            h_cost = self._calculate_heuristic(root)  # H(n) = estimated cost to goal
+            f_cost = g_cost + h_cost  # F(n) = total estimated cost
+            if h_cost == float('inf'):
+                return None
+            
+            open_list.push(f_cost, h_cost, root, root_node)
+            
+            root.MarkAsVisited()
+            state_hash = self._hash_state(root)
+            
+            # Track best f_cost for each state
+            self._best_f_cost = {state_hash: f_cost}
+        best_f_cost = self._best_f_cost
         
-        while priority_queue:
-            if self.visited_count >= self.max_nodes:
+        while open_list:
+            if self._budget_exhausted():
                 return None
             
-            if len(priority_queue) > self.max_queue_size:
-                self.max_queue_size = len(priority_queue)
+            if len(open_list) > self.max_queue_size:
+                self.max_queue_size = len(open_list)
             
-            current_f_cost, _, current_state = heapq.heappop(priority_queue)
+            current_f_cost, current_state, current_node = open_list.pop()
             self.visited_count += 1
+            self._track_best(current_state)
             
             # Check if reached goal
             if current_state.IsFinalState():
-                self.solution_found = current_state
-                self._reconstruct_path(current_state)
-                return current_state
+                return self._reconstruct_path(current_node)
             
             current_hash = self._hash_state(current_state)
             
             # Skip if we found better path to this state already
             if current_f_cost > best_f_cost.get(current_hash, float('inf')):
+                open_list.discard()
                 continue
             
-            # Get all possible next states
-            next_states = current_state.GetPossibleMoves()
+            # Distance maps are refreshed once per expanded state and shared by its children
+            maps = None
+            current_h = 0.0
+            if self.distances is not None:
+                maps = self.distances.maps_for(current_state)
+                current_h = self.distances.estimate(current_state, maps)
+                # The refreshed maps show some end cut off: no child can reach it either
+                if current_h == float('inf'):
+                    continue
             
-            for next_state in next_states:
+            # Get all possible next states
+            for move, next_state in self._expand(current_state):
                 next_hash = self._hash_state(next_state)
                 
                 # Calculate costs for next state
                 g_next = next_state.get_total_cost()  # G(n) = actual cost from start
-                h_next = self._calculate_heuristic(next_state)  # H(n) = estimated cost to goal
+                h_next = self._calculate_heuristic(next_state, maps, current_state, current_h, move)  # H(n) = estimated cost to goal
                 f_next = g_next + h_next  # F(n) = total estimated cost
                 
+                # Some end can no longer be reached
+                if h_next == float('inf'):
+                    continue
+                
                 # Only add if this is better path to this state
                 if f_next < best_f_cost.get(next_hash, float('inf')):
                     best_f_cost[next_hash] = f_next
                     next_state.MarkAsVisited()
-                    heapq.heappush(priority_queue, (f_next, counter, next_state))
-                    counter += 1
-                    
-                    self.parent_map[next_hash] = current_state
+                    next_node = self._add_node(current_node, move)
+                    # Equal f: the entry with the lower h (closer to a solution) comes out first
+                    open_list.push(f_next, h_next, next_state, next_node)
         
         return None
     
-    def _calculate_heuristic(self, state: Game) -> float:
+    def _checkpoint_options(self) -> dict:
+        return dict(super()._checkpoint_options(), heuristic=self.heuristic, open_list=self.open_list.kind)
+    
+    def _checkpoint_state(self) -> tuple:
+        """Open list, best f per state hash and the queue peak"""
+        open_meta, sections = self.open_list.checkpoint()
+        sections["best_f.keys"] = array('Q', self._best_f_cost.keys())
+        sections["best_f.values"] = array('d', self._best_f_cost.values())
+        return {"open_list": open_meta, "max_queue_size": self.max_queue_size}, sections
+    
+    def _load_checkpoint_state(self, meta: dict, reader):
+        self.open_list.restore(meta["open_list"], reader, self._unpack_states)
+        self._best_f_cost = dict(zip(reader.section("best_f.keys"), reader.section("best_f.values")))
+        self.max_queue_size = meta["max_queue_size"]
+    
+    def _progress_details(self) -> tuple:
+        """Frontier size, then f, g and depth of the best frontier entry"""
+        queue = self._frontier
+        if not queue:
+            return 0, None, None, None
+        f_cost, state, node = queue.peek()
+        return len(queue), f_cost, state.get_total_cost(), self.nodes.depth(node)
+    
+    def _calculate_heuristic(self, state: Game, maps=None, parent=None, parent_h=0.0, moves=()) -> float:
         """
         H(n) = Heuristic estimate of cost from current state to goal.
-        Uses Manhattan distance for all incomplete colors.
+        With the dijkstra heuristic: weighted distance of every incomplete
+        color to its end, from `maps` (the parent's) or maps built for `state`.
+        Given the parent, its h under the same maps and the moves in between,
+        only the moved colors' terms are recomputed.
+        Otherwise Manhattan distance for all incomplete colors, which the
+        state keeps as a running total.
         """
-        total_distance = 0
-        
-        for color, path in state.paths.items():
-            # Skip completed colors
-            if color in state.completed_colors:
-                continue
-            
-            # Get current position and end position
-            current_pos = path[-1]
-            end_pos = tuple(state.board.positions[color]["end"])
-            
-            # Calculate Manhattan distance
-            manhattan = self._get_manhattan_distance(current_pos, end_pos)
-            total_distance += manhattan
-        
-        return float(total_distance)
-    
-    def _get_manhattan_distance(self, pos1: tuple, pos2: tuple) -> int:
-        """Calculate Manhattan distance between two positions"""
-        return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
+        if self.distances is None:
+            return float(state.manhattan_total)
+        
+        if maps is None:
+            maps = self.distances.maps_for(state)
+        if parent is None:
+            return self.distances.estimate(state, maps)
+        return self.distances.estimate_after(parent, parent_h, state, moves, maps)
     
     def print_solution(self):
         """Print the final solution"""
@@ -129,7 +183,7 @@ class AStar_Solver(BaseSolver):
         print("\nFINAL SOLUTION")
         print("="*60)
         
-        self.solution_found.board.printGrid()
+        self.solution_found.printGrid()
         
         print("\nPaths:")
         for color, path in self.solution_found.paths.items():
@@ -145,6 +199,5 @@ class AStar_Solver(BaseSolver):
         print(f"H(n) - Heuristic to goal: {h_cost:.2f}")
         print(f"F(n) - Total estimated cost: {f_cost:.2f}")
         
-        print(f"\nStates explored: {self.visited_count:,}")
-        print(f"Max queue size: {self.max_queue_size:,}")
+        self._print_search_stats()
         print("="*60)
\ No newline at end of file
@@ -1,27 +1,33 @@
 from Game import Game
 from BaseSolver import BaseSolver
+from NodeTable import NodeTable
+from array import array
 from typing import Optional
 from collections import deque
 
 class BFS_Solver(BaseSolver):
     
-    def __init__(self, initial_game: Game, max_nodes=None):
-        super().__init__(initial_game, max_nodes)
+    supports_checkpoint = True
+    
+    def __init__(self, initial_game: Game, max_nodes=None, **options):
+        super().__init__(initial_game, max_nodes, **options)
         self.max_queue_size = 0
     
     def solve(self) -> Optional[Game]:
         print("\nStarting BFS Search...")
         print(f"Board: {self.initial_game.board.rows}x{self.initial_game.board.cols}, Colors: {len(self.initial_game.board.positions)}")
         
-        self.visited_count = 0
+        self._start_budget()
         self.max_queue_size = 0
         self.solution_found = None
         self.solution_path = []
-        self.parent_map = {}
+        self.solution_moves = []
+        self.nodes = NodeTable()
         
         self.initial_game.visited_states.clear()
         result = self._bfs_iterative()
         
+        self._finish_progress()
         print(f"\nBFS Complete: {self.visited_count:,} states visited, max queue: {self.max_queue_size:,}")
         
         if result:
@@ -32,36 +38,55 @@ class BFS_Solver(BaseSolver):
             return None
     
     def _bfs_iterative(self) -> Optional[Game]:
+        # Queue entries are (state, node index in the node table)
         queue = deque()
-        queue.append(self.initial_game)
-        self.initial_game.MarkAsVisited()
+        self._frontier = queue
         
-        state_hash = self._hash_state(self.initial_game)
-        self.parent_map[state_hash] = None
+        if self.resume:
+            self._restore_checkpoint()
+        else:
+            root, root_node = self._root()
+            if root is None:
+                return None
+            queue.append((root, root_node))
+            root.MarkAsVisited()
         
         while queue:
-            if self.visited_count >= self.max_nodes:
+            if self._budget_exhausted():
                 return None
             
             if len(queue) > self.max_queue_size:
                 self.max_queue_size = len(queue)
             
-            current_state = queue.popleft()
+            current_state, current_node = queue.popleft()
             self.visited_count += 1
+            self._track_best(current_state)
             
             if current_state.IsFinalState():
-                self.solution_found = current_state
-                self._reconstruct_path(current_state)
-                return current_state
-            
-            current_hash = self._hash_state(current_state)
-            next_states = current_state.GetPossibleMoves()
+                return self._reconstruct_path(current_node)
             
-            for next_state in next_states:
+            for move, next_state in self._expand(current_state):
                 next_state.MarkAsVisited()
-                queue.append(next_state)
-                
-                next_hash = self._hash_state(next_state)
-                self.parent_map[next_hash] = current_state
+                queue.append((next_state, self._add_node(current_node, move)))
         
-        return None
\ No newline at end of file
+        return None
+    
+    def _checkpoint_state(self) -> tuple:
+        """Queue in order (states as records plus their nodes) and the queue peak"""
+        queue = self._frontier
+        sections = {
+            "queue.states": self._pack_states(state for state, _ in queue),
+            "queue.nodes": array('q', (node for _, node in queue)),
+        }
+        return {"max_queue_size": self.max_queue_size}, sections
+    
+    def _load_checkpoint_state(self, meta: dict, reader):
+        self._frontier.extend(zip(self._unpack_states(reader.section("queue.states")), reader.section("queue.nodes")))
+        self.max_queue_size = meta["max_queue_size"]
+    
+    def _progress_details(self) -> tuple:
+        """Frontier size and the depth of the newest (deepest) queued node"""
+        queue = self._frontier
+        if not queue:
+            return 0, None, None, None
+        return len(queue), None, None, self.nodes.depth(queue[-1][1])
\ No newline at end of file
@@ -0,0 +1,48 @@
+import contextlib
+import io
+import time
+from Board import Board
+from Game import Game
+from DFS_Solver import DFS_Solver
+from BFS_Solver import BFS_Solver
+from UCS_Solver import UCS_Solver
+from AStar_Solver import AStar_Solver
+
+# (rows, cols, {color: (start, end)}, weights or None)
+PUZZLES = {
+    "5x5": (5, 5, {1: ((0, 0), (4, 1)), 2: ((0, 2), (3, 1)), 3: ((0, 4), (3, 3)), 4: ((1, 2), (4, 4))}, None),
+    "5x5 weighted": (5, 5, {1: ((0, 0), (4, 0)), 2: ((0, 4), (4, 4)), 3: ((1, 2), (3, 2))},
+                     [1, 2, 3, 1, 1, 5, 1, 9, 1, 2, 1, 1, 1, 1, 1, 2, 7, 1, 3, 1, 1, 1, 4, 1, 1]),
+    "6x6": (6, 6, {1: ((0, 0), (5, 5)), 2: ((0, 5), (2, 2)), 3: ((5, 0), (3, 3)), 4: ((1, 4), (4, 1))}, None),
+}
+
+SOLVERS = {"DFS": DFS_Solver, "BFS": BFS_Solver, "UCS": UCS_Solver, "A*": AStar_Solver}
+
+def build_game(rows, cols, endpoints, weights=None) -> Game:
+    board = Board(cols, rows, len(endpoints))
+    board.set_positions({color: {"start": start, "end": end} for color, (start, end) in endpoints.items()})
+    if weights is not None:
+        board.set_weights(weights)
+    return Game(board)
+
+def run_solver(solver_class, game: Game, backend: str, max_nodes: int, **options) -> tuple:
+    """(visited nodes, seconds, total cost or None) of one solve, with solver output suppressed"""
+    solver = solver_class(game.CopyState(), max_nodes=max_nodes, backend=backend, **options)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = solver.solve()
+    elapsed = time.perf_counter() - start
+    return solver.visited_count, elapsed, result.get_total_cost() if result else None
+
+def main(max_nodes=200000, **options):
+    print(f"{'puzzle':14} {'solver':6} {'backend':9} {'nodes':>8} {'seconds':>8} {'nodes/s':>10} {'cost':>6}")
+    for name, (rows, cols, endpoints, weights) in PUZZLES.items():
+        game = build_game(rows, cols, endpoints, weights)
+        for solver_name, solver_class in SOLVERS.items():
+            for backend in ("grid", "bitboard"):
+                nodes, elapsed, cost = run_solver(solver_class, game, backend, max_nodes, **options)
+                rate = nodes / elapsed if elapsed > 0 else float('inf')
+                print(f"{name:14} {solver_name:6} {backend:9} {nodes:8d} {elapsed:8.3f} {rate:10.0f} {cost!s:>6}")
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,394 @@
 from Game import Game
+from BitboardGame import BitboardGame
+from NodeTable import NodeTable
+from SolveResult import SolveResult
+from SearchProgress import SearchProgress
+from Checkpoint import CheckpointReader, write_checkpoint
+from array import array
 from typing import Optional
+import hashlib
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows: no RSS source, memory_limit is not enforced
+    resource = None
+
+def peak_rss() -> Optional[int]:
+    """
+    Peak resident set size of this process in bytes, or None where it is not
+    reported. Linux's VmHWM covers this process image alone; ru_maxrss, the
+    fallback, also carries the peak of the process it was forked from.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def _current_rss() -> Optional[int]:
+    """Resident set size of this process in bytes (peak RSS where the current one is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    return peak_rss()
 
 class BaseSolver:
    
+    # Solvers that can snapshot their search to a checkpoint file and resume from it
+    supports_checkpoint = False
     
-    def __init__(self, initial_game: Game, max_nodes=None):
+    def __init__(self, initial_game: Game, max_nodes=None, propagate=False, prune=False,
+                 most_constrained=False, backend="grid", time_limit=None, deadline=None,
+                 memory_limit=None, cancel_token=None, observer=None, observe_every=1000,
+                 profiler=None, checkpoint=None, checkpoint_every=100000, resume=None):
+        # State representation to search with: "grid" (byte grid) or "bitboard" (int masks)
+        if backend == "bitboard":
+            initial_game = BitboardGame.from_game(initial_game)
+        elif backend != "grid":
+            raise ValueError(f"Unknown backend {backend!r}, expected 'grid' or 'bitboard'")
+        self.backend = backend
         self.initial_game = initial_game
+        # Apply forced moves to every generated state before it is queued
+        self.propagate = propagate
+        # Drop generated states whose unfinished colors can no longer reach their ends
+        self.prune = prune
+        # Branch on the single unfinished color with the fewest legal moves
+        self.most_constrained = most_constrained
         self.solution_found = None
+        # True when solution_found came from adopt_solution, so no search statistics exist
+        self.adopted = False
         self.visited_count = 0
         self.max_nodes = max_nodes if max_nodes else float('inf')
+        # Wall-clock budget in seconds per solve() call, and/or an absolute
+        # time.monotonic() deadline shared with the caller; the earlier one wins
+        self.time_limit = time_limit
+        self.fixed_deadline = deadline
+        self.deadline = None
+        # Resident memory ceiling in megabytes
+        self.memory_limit = memory_limit
+        # Anything with is_set() (CancellationToken, threading/multiprocessing Event)
+        self.cancel_token = cancel_token
+        # Why the last solve() gave up early: None, "nodes", "time", "memory" or "cancelled"
+        self.stop_reason = None
+        # Partial state with the most completed colors seen by the last solve()
+        self.best_state = None
+        self.best_completed = -1
+        self.result = None
+        # Called with a SearchProgress every observe_every expansions and at the end
+        self.observer = observer
+        self.observe_every = observe_every
+        self.start_time = None
+        # The running search's queue/stack, read only when progress is reported
+        self._frontier = None
+        # Node count at which _budget_exhausted next needs more than a comparison
+        self._next_check = 0
+        self._next_limit_check = float('inf')
+        self._next_report = float('inf')
         self.solution_path = []
-        self.parent_map = {}
-    
-    def _hash_state(self, state: Game) -> str:
-        """Create unique hash for a state"""
-        return str(state.board.grid.tobytes()) + str(state.paths)
-    
-    def _reconstruct_path(self, final_state: Game):
-        """Reconstruct solution path from parent map"""
-        path = []
-        current = final_state
-        current_hash = self._hash_state(current)
-        
-        while current_hash in self.parent_map:
-            path.append(current)
-            parent = self.parent_map[current_hash]
-            if parent is None:
-                break
-            current = parent
-            current_hash = self._hash_state(current)
-        
-        path.reverse()
+        self.solution_moves = []
+        self.nodes = NodeTable()
+        # Checkpoint file written every checkpoint_every expanded nodes and when a
+        # budget stops the search; resume is a checkpoint that solve() continues from
+        if (checkpoint or resume) and not self.supports_checkpoint:
+            raise ValueError(f"{type(self).__name__} does not support checkpoints")
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self.resume = resume
+        self.checkpoints_written = 0
+        self._next_checkpoint = float('inf')
+        # Opt-in PhaseProfiler: solve() then runs with its phases timed
+        self.profiler = profiler
+        if profiler is not None:
+            self.solve = profiler.profiled(type(self).__name__, self.solve)
+    
+    def _start_budget(self):
+        """Reset the node count, best state, clock and progress schedule for a new solve() call"""
+        self.visited_count = 0
+        self.stop_reason = None
+        self.adopted = False
+        self.best_state = self.initial_game
+        self.best_completed = len(self.initial_game.completed_colors)
+        self.start_time = time.monotonic()
+        self._frontier = None
+        self.deadline = self.fixed_deadline
+        if self.time_limit:
+            limit = self.start_time + self.time_limit
+            self.deadline = limit if self.deadline is None else min(self.deadline, limit)
+        
+        has_limits = self.cancel_token is not None or self.deadline is not None or self.memory_limit is not None
+        self._next_limit_check = 0 if has_limits else float('inf')
+        self._next_report = self.observe_every if self.observer is not None else float('inf')
+        self._next_checkpoint = self.checkpoint_every if self.checkpoint else float('inf')
+        self._next_check = 0
+    
+    def _budget_exhausted(self) -> bool:
+        """
+        True once any limit is spent. Called for every node, so without limits
+        or an observer it is a single comparison against max_nodes.
+        """
+        if self.visited_count < self._next_check:
+            return False
+        return self._check_budget()
+    
+    def _check_budget(self) -> bool:
+        """
+        Slow path of _budget_exhausted: max_nodes, then every 256 nodes the
+        cancel token, clock and memory, then the observer and the checkpoint
+        when they are due. A budget stop also writes the checkpoint, so the
+        search can be resumed with a larger budget.
+        """
+        count = self.visited_count
+        reason = None
+        if count >= self.max_nodes:
+            reason = "nodes"
+        elif count >= self._next_limit_check:
+            self._next_limit_check = count + 256
+            if self.cancel_token is not None and self.cancel_token.is_set():
+                reason = "cancelled"
+            elif self.deadline is not None and time.monotonic() >= self.deadline:
+                reason = "time"
+            elif self.memory_limit is not None:
+                rss = _current_rss()
+                if rss is not None and rss >= self.memory_limit * 1024 * 1024:
+                    reason = "memory"
+        
+        if reason is not None:
+            self.stop_reason = reason
+            if self.checkpoint:
+                self.save_checkpoint(self.checkpoint)
+            return True
+        
+        if count >= self._next_report:
+            self._next_report = count + self.observe_every
+            self._report_progress()
+        
+        if count >= self._next_checkpoint:
+            self._next_checkpoint = count + self.checkpoint_every
+            self.save_checkpoint(self.checkpoint)
+        
+        self._next_check = min(self.max_nodes, self._next_limit_check, self._next_report, self._next_checkpoint)
+        return False
+    
+    def _progress_details(self) -> tuple:
+        """(frontier size, best f, best g, depth) of the running search; solvers refine this"""
+        frontier = len(self._frontier) if self._frontier is not None else 0
+        return frontier, None, None, None
+    
+    def _finish_progress(self):
+        """Final observer report of a solve() call; releases the frontier reference"""
+        self._report_progress(final=True)
+        self._frontier = None
+    
+    def _report_progress(self, final: bool = False):
+        """Send a SearchProgress to the observer (no-op without one)"""
+        if self.observer is None:
+            return
+        frontier, best_f, best_g, depth = self._progress_details()
+        self.observer(SearchProgress(type(self).__name__, self.visited_count, time.monotonic() - self.start_time,
+                                     frontier, best_f, best_g, depth, _current_rss(), final))
+    
+    def _checkpoint_options(self) -> dict:
+        """Options that change the search; a checkpoint only resumes under the same ones"""
+        return {"propagate": self.propagate, "prune": self.prune, "most_constrained": self.most_constrained}
+    
+    def _puzzle_fingerprint(self) -> str:
+        spec = self.initial_game.spec
+        digest = hashlib.sha256(repr((spec.rows, spec.cols, spec.starts, spec.ends, spec.weights)).encode())
+        digest.update(spec.initial_grid)
+        return digest.hexdigest()
+    
+    def _checkpoint_state(self) -> tuple:
+        """(meta, sections) of the running search, at the top of its loop; checkpointing solvers implement this"""
+        raise NotImplementedError
+    
+    def _load_checkpoint_state(self, meta: dict, reader):
+        """Rebuild the search from a checkpoint written by _checkpoint_state"""
+        raise NotImplementedError
+    
+    def save_checkpoint(self, path: str):
+        """Snapshot the running search (frontier, closed set, tables, counters) to `path`"""
+        meta, sections = self._checkpoint_state()
+        meta.update(solver=type(self).__name__, puzzle=self._puzzle_fingerprint(),
+                    options=self._checkpoint_options(), visited_count=self.visited_count,
+                    best_completed=self.best_completed)
+        sections["visited"] = array('Q', self.initial_game.visited_states)
+        sections["nodes.parents"] = self.nodes.parents
+        sections["nodes.colors"] = self.nodes.colors
+        sections["nodes.cells"] = self.nodes.cells
+        sections["best"] = self._pack_states([self.best_state])
+        write_checkpoint(path, meta, sections)
+        self.checkpoints_written += 1
+    
+    def _restore_checkpoint(self):
+        """Continue from self.resume: counters, visited set, node table, then the solver's own state"""
+        with CheckpointReader(self.resume) as reader:
+            meta = reader.meta
+            if meta["solver"] != type(self).__name__:
+                raise ValueError(f"{self.resume}: checkpoint of {meta['solver']}, not {type(self).__name__}")
+            if meta["puzzle"] != self._puzzle_fingerprint():
+                raise ValueError(f"{self.resume}: checkpoint of a different puzzle")
+            if meta["options"] != self._checkpoint_options():
+                raise ValueError(f"{self.resume}: checkpoint written with options {meta['options']}")
+            
+            visited = self.initial_game.visited_states
+            visited.clear()
+            visited.update(reader.section("visited"))
+            self.nodes = NodeTable.load(reader.section("nodes.parents"), reader.section("nodes.colors"),
+                                        reader.section("nodes.cells"))
+            self.best_state = self._unpack_states(reader.section("best"))[0]
+            self.best_completed = meta["best_completed"]
+            self.visited_count = meta["visited_count"]
+            self._load_checkpoint_state(meta, reader)
+        
+        # Reschedule the slow-path checks from the restored node count
+        count = self.visited_count
+        if self._next_limit_check != float('inf'):
+            self._next_limit_check = count
+        if self.observer is not None:
+            self._next_report = count + self.observe_every
+        if self.checkpoint:
+            self._next_checkpoint = count + self.checkpoint_every
+        self._next_check = 0
+    
+    def _pack_states(self, states) -> array:
+        """PackState records of `states`, back to back"""
+        records = array('B')
+        for state in states:
+            records.frombytes(state.PackState())
+        return records
+    
+    def _unpack_states(self, records) -> list:
+        """States of back-to-back PackState records (trails hold only the heads)"""
+        root = self.initial_game
+        size = len(root.PackState())
+        data = bytes(records)
+        return [root.UnpackState(data[offset:offset + size]) for offset in range(0, len(data), size)]
+    
+    def _track_best(self, state: Game, copy: bool = False):
+        """Remember `state` if it completes more colors than any before (copy it if it will be mutated)"""
+        completed = len(state.completed_colors)
+        if completed > self.best_completed:
+            self.best_completed = completed
+            self.best_state = state.CopyState() if copy else state
+    
+    def run(self) -> SolveResult:
+        """solve() wrapped into a SolveResult, which also reports budget stops and the best partial state"""
+        start = time.monotonic()
+        solution = self.solve()
+        elapsed = time.monotonic() - start
+        
+        if solution is not None and solution.IsFinalState():
+            self.result = SolveResult("solved", solution, solution, self.visited_count, elapsed)
+        else:
+            self.result = SolveResult(self.stop_reason or "unsolved", None, self.best_state,
+                                      self.visited_count, elapsed)
+        return self.result
+    
+    def _hash_state(self, state: Game) -> int:
+        """64-bit Zobrist key of a state, maintained incrementally by Game"""
+        return state.zobrist_key
+    
+    def _add_node(self, parent: int, moves) -> int:
+        """Record the (color, cell, cost) moves that created a child of node `parent`"""
+        for color, cell, _ in moves:
+            parent = self.nodes.add(parent, color, cell)
+        return parent
+    
+    def _root(self) -> tuple:
+        """(state, node) the search starts from; state is None if propagation proves it unsolvable"""
+        if not self.propagate:
+            if self.prune and self.initial_game.IsDeadEnd():
+                return None, NodeTable.ROOT
+            return self.initial_game, NodeTable.ROOT
+        
+        state = self.initial_game.CopyState()
+        forced = state.PropagateForcedMoves()
+        if forced is None or (self.prune and state.IsDeadEnd()):
+            return None, NodeTable.ROOT
+        return state, self._add_node(NodeTable.ROOT, forced)
+    
+    def _expand(self, state: Game) -> list:
+        """(moves, next_state) successors of an expanded state, propagated and pruned as configured"""
+        successors = state.GetSuccessors(self.propagate, self.most_constrained)
+        if not self.prune:
+            return successors
+        
+        # The expanded state itself passed pruning
+        alive = []
+        for moves, next_state in successors:
+            if not self._is_dead_after(next_state, moves):
+                alive.append((moves, next_state))
+        return alive
+    
+    def _is_dead_after(self, state: Game, moves) -> bool:
+        """
+        Dead-end check of a state reached by (color, cell, cost) moves from a
+        parent that passed it. Only the cells around a single move can have
+        changed, so that case takes the incremental check; a group of
+        propagated moves takes the full one.
+        """
+        if len(moves) == 1:
+            color, cell, _ = moves[0]
+            return state.IsDeadEndAfterMove(color, cell)
+        return state.IsDeadEnd()
+    
+    def _moves_to_node(self, node: int) -> list:
+        """(color, cell, cost) moves leading from the initial state to a node"""
+        weights = self.initial_game.spec.weights
+        return [(color, cell, weights[cell]) for color, cell in self.nodes.moves_to(node)]
+    
+    def _reconstruct_path(self, node: int) -> Game:
+        """
+        Reconstruct solution path by walking parent indices in the node table.
+        The replayed final state becomes solution_found: a state restored from
+        a checkpoint holds only its path heads, the replay holds whole paths.
+        """
+        self.solution_found = self._replay_moves(self._moves_to_node(node))
+        return self.solution_found
+    
+    def _replay_moves(self, moves: list) -> Game:
+        """Rebuild solution_path by replaying (color, cell, cost) moves from the initial state"""
+        state = self.initial_game.CopyState()
+        path = [state]
+        for color, cell, cost in moves:
+            state = state.CopyState()
+            state.ApplyMove(color, cell, cost)
+            path.append(state)
+        
         self.solution_path = path
+        self.solution_moves = list(moves)
+        return state
+    
+    def _undo_group(self, game: Game, group: list):
+        """Undo one group of (color, cell, cost) moves applied in place"""
+        for color, _, cost in reversed(group):
+            game.UndoMove(color, cost)
+    
+    def _finish_in_place(self, root_moves: list, move_log: list) -> Game:
+        """Solution of an in-place search, rebuilt from its root moves and move log"""
+        moves = list(root_moves)
+        for group in move_log:
+            moves.extend(group)
+        self.solution_found = self._replay_moves(moves)
+        return self.solution_found
+    
+    def adopt_solution(self, moves: list) -> Game:
+        """Take (color, cell, cost) moves solved elsewhere, e.g. a solution cache hit, as this solver's solution"""
+        self.solution_found = self._replay_moves(moves)
+        self.adopted = True
+        return self.solution_found
     
     def print_solution_path(self):
         """Print the solution path step by step"""
@@ -51,7 +408,7 @@ class BaseSolver:
         
         for i, state in enumerate(self.solution_path):
             print(f"Step {i}:")
-            state.board.printGrid()
+            state.printGrid()
             print()
         
         print(f"{'='*60}")
@@ -65,7 +422,7 @@ class BaseSolver:
         print("FINAL SOLUTION")
         print(f"{'='*60}")
         
-        self.solution_found.board.printGrid()
+        self.solution_found.printGrid()
         
         print("\nPaths:")
         for color, path in self.solution_found.paths.items():
@@ -80,12 +437,19 @@ class BaseSolver:
         if hasattr(self.solution_found, 'get_total_cost'):
             print(f"\nBest total cost: {self.solution_found.get_total_cost():.2f}")
         
+        self._print_search_stats()
+        print(f"{'='*60}")
+    
+    def _print_search_stats(self):
+        """States explored and algorithm-specific metrics, or a note that the solution was adopted without a search"""
+        if self.adopted:
+            print("\nAnswered from the solution cache, no search statistics")
+            return
+        
         print(f"\nStates explored: {self.visited_count:,}")
         
         # Show algorithm-specific metrics
         if hasattr(self, 'max_depth'):
             print(f"Max depth: {self.max_depth}")
         if hasattr(self, 'max_queue_size'):
-            print(f"Max queue size: {self.max_queue_size:,}")
-        
-        print(f"{'='*60}")
\ No newline at end of file
+            print(f"Max queue size: {self.max_queue_size:,}")
\ No newline at end of file
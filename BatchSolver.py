@@ -0,0 +1,155 @@
+import contextlib
+import io
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, Optional
+from DFS_Solver import DFS_Solver
+from BFS_Solver import BFS_Solver
+from ExternalBFS_Solver import ExternalBFS_Solver
+from UCS_Solver import UCS_Solver
+from HillClimbing_Solver import HillClimbing_Solver
+from AStar_Solver import AStar_Solver
+from IDAStar_Solver import IDAStar_Solver
+from PuzzleFile import Puzzle
+from SolutionCache import DEFAULT_MAX_ENTRIES, open_cache
+
+SOLVERS = {
+    "dfs": DFS_Solver,
+    "bfs": BFS_Solver,
+    "extbfs": ExternalBFS_Solver,
+    "ucs": UCS_Solver,
+    "hill": HillClimbing_Solver,
+    "astar": AStar_Solver,
+    "idastar": IDAStar_Solver,
+}
+
+# Solvers whose first solution is cost-optimal (A* while its heuristic is admissible; IDA* always uses the distance maps)
+OPTIMAL_SOLVERS = ("ucs", "astar", "idastar")
+
+def proves_optimality(solver_name: str, weights, options: dict) -> bool:
+    """True if a solution from this solver, with these options and cell weights, is proven cheapest"""
+    if solver_name not in OPTIMAL_SOLVERS:
+        return False
+    # The distance-map heuristic is always admissible; the Manhattan one counts
+    # steps, so it underestimates only while every step costs >= 1
+    return (solver_name != "astar" or options.get("heuristic", "dijkstra") == "dijkstra"
+            or weights is None or min(weights) >= 1)
+
+class BatchResult:
+    """
+    Outcome of one puzzle. Only plain data crosses the process boundary:
+    the solution comes back as (color, cell, cost) moves and (row, col) paths,
+    never as Game objects.
+    """
+
+    __slots__ = ('index', 'puzzle', 'solver', 'status', 'cost', 'nodes', 'seconds', 'moves', 'paths', 'error',
+                 'cached')
+
+    def __init__(self, index: int, puzzle: Puzzle, solver: str, status: str, cost=None, nodes=0, seconds=0.0,
+                 moves=None, paths=None, error=None, cached=None):
+        self.index = index
+        self.puzzle = puzzle
+        self.solver = solver
+        # "solved", "unsolved" (search exhausted), a budget stop ("nodes", "time", "memory",
+        # "cancelled") or "error"
+        self.status = status
+        self.cost = cost
+        self.nodes = nodes
+        self.seconds = seconds
+        self.moves = moves
+        self.paths = paths
+        self.error = error
+        # Solver that found the solution, when it came from the solution cache
+        self.cached = cached
+
+    @property
+    def solved(self) -> bool:
+        return self.status == "solved"
+
+    def solved_puzzle(self) -> Puzzle:
+        """The input puzzle with the solution found attached (unchanged if unsolved)"""
+        if self.paths is None:
+            return self.puzzle
+        puzzle = self.puzzle
+        return Puzzle(puzzle.rows, puzzle.cols, puzzle.endpoints, puzzle.weights, self.paths, puzzle.name)
+
+def solve_puzzle(puzzle: Puzzle, solver_name: str = "dfs", max_nodes=None, time_limit=None,
+                 index: int = 0, checkpoint_dir=None, cache_path=None, cache_size=DEFAULT_MAX_ENTRIES,
+                 **options) -> BatchResult:
+    """
+    Solve one puzzle with solver output suppressed (runs in the worker processes).
+    With checkpoint_dir the search is checkpointed to puzzle-<index>.ckpt there,
+    resumed from that file if it exists, and the file is removed once the search ends
+    without a budget stop. With cache_path a cached solution is returned without
+    searching (a proven-optimal one for an optimal solver), and new solutions are
+    added to the cache.
+    """
+    start = time.time()
+    optimal = proves_optimality(solver_name, puzzle.weights, options)
+    checkpoint = None
+    if checkpoint_dir is not None:
+        checkpoint = os.path.join(checkpoint_dir, f"puzzle-{index:05d}.ckpt")
+        options = dict(options, checkpoint=checkpoint, resume=checkpoint if os.path.exists(checkpoint) else None)
+    cache = None
+    try:
+        if cache_path is not None:
+            cache = open_cache(cache_path, cache_size)
+            hit = cache.get(puzzle, require_optimal=optimal)
+            if hit is not None:
+                return BatchResult(index, puzzle, solver_name, "solved", hit.cost, 0, time.time() - start,
+                                   hit.moves, hit.paths, cached=hit.solver)
+        solver = SOLVERS[solver_name](puzzle.to_game(), max_nodes=max_nodes, time_limit=time_limit, **options)
+        with contextlib.redirect_stdout(io.StringIO()):
+            solution = solver.solve()
+    except Exception as e:
+        return BatchResult(index, puzzle, solver_name, "error", seconds=time.time() - start, error=f"{type(e).__name__}: {e}")
+    elapsed = time.time() - start
+    if checkpoint is not None and solver.stop_reason is None and os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    # Hill climbing returns its best state even when stuck
+    if solution is None or not solution.IsFinalState():
+        return BatchResult(index, puzzle, solver_name, solver.stop_reason or "unsolved", nodes=solver.visited_count,
+                           seconds=elapsed)
+
+    cost = solution.get_total_cost()
+    if cache is not None:
+        cache.put(puzzle, solver.solution_moves, solver_name, cost, optimal)
+    return BatchResult(index, puzzle, solver_name, "solved", cost, solver.visited_count, elapsed,
+                       list(solver.solution_moves), solution.paths)
+
+def solve_batch(puzzles: Iterable[Puzzle], solver_name: str = "dfs", max_nodes=None, time_limit=None,
+                workers: Optional[int] = None, **options) -> Iterator[BatchResult]:
+    """
+    Solve puzzles across a process pool, yielding results as they finish
+    (not in input order; BatchResult.index gives the position). Only a few
+    tasks per worker are in flight, so huge corpora stream through in
+    constant memory. workers=1 solves in this process.
+    """
+    if solver_name not in SOLVERS:
+        raise ValueError(f"Unknown solver {solver_name!r}, expected one of {sorted(SOLVERS)}")
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for index, puzzle in enumerate(puzzles):
+            yield solve_puzzle(puzzle, solver_name, max_nodes, time_limit, index, **options)
+        return
+
+    tasks = enumerate(puzzles)
+    max_in_flight = workers * 4
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for index, puzzle in tasks:
+            pending.add(pool.submit(solve_puzzle, puzzle, solver_name, max_nodes, time_limit, index, **options))
+            if len(pending) >= max_in_flight:
+                break
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+            for index, puzzle in tasks:
+                pending.add(pool.submit(solve_puzzle, puzzle, solver_name, max_nodes, time_limit, index, **options))
+                if len(pending) >= max_in_flight:
+                    break
@@ -0,0 +1,184 @@
+from typing import List, Optional
+from Board import Board
+from Game import Game
+from PuzzleSpec import PuzzleSpec
+
+class BitboardTables:
+    """Per-puzzle masks for the bitboard backend, built once and shared by every state"""
+
+    __slots__ = ('cols', 'full', 'not_first_col', 'not_last_col', 'cell_neighbors', 'initial_free')
+
+    def __init__(self, spec: PuzzleSpec):
+        self.cols = spec.cols
+        self.full = (1 << spec.size) - 1
+        first_col = 0
+        for row in range(spec.rows):
+            first_col |= 1 << (row * spec.cols)
+        self.not_first_col = self.full & ~first_col
+        self.not_last_col = self.full & ~(first_col << (spec.cols - 1))
+
+        cell_neighbors = []
+        for cell in range(spec.size):
+            mask = 0
+            for nxt in spec.neighbors[cell]:
+                mask |= 1 << nxt
+            cell_neighbors.append(mask)
+        self.cell_neighbors = tuple(cell_neighbors)
+
+        self.initial_free = 0
+        for cell, value in enumerate(spec.initial_grid):
+            if value == 0:
+                self.initial_free |= 1 << cell
+
+    def spread(self, bits: int) -> int:
+        """Cells orthogonally adjacent to any cell of `bits`, by shifting the whole board"""
+        return ((bits << self.cols)
+                | (bits >> self.cols)
+                | ((bits & self.not_last_col) << 1)
+                | ((bits & self.not_first_col) >> 1)) & self.full
+
+
+class BitboardGame(Game):
+    """
+    Game backend that keeps occupancy as arbitrary-precision int bitboards instead
+    of a byte grid: `free` has bit i set while cell i is empty, and the inherited
+    per-color `occupancy` masks hold the paths. Copies are a handful of int and
+    dict references, and region checks flood-fill by shifting whole bitboards.
+    The grid is still available as a read-only view for printing and manual play.
+    """
+
+    __slots__ = ('free', 'tables')
+
+    def __init__(self, board: Board):
+        self._load(Game(board))
+
+    @classmethod
+    def from_game(cls, game: Game) -> 'BitboardGame':
+        """Bitboard copy of any Game state (sharing its visited set)"""
+        state = cls.__new__(cls)
+        state._load(game)
+        return state
+
+    def _load(self, game: Game):
+        self.board = game.board
+        self.spec = game.spec
+        self.tables = BitboardTables(game.spec)
+        self.trails = game.trails.copy()
+        self.occupancy = game.occupancy.copy()
+        self.path_costs = game.path_costs.copy()
+        self.completed_colors = game.completed_colors.copy()
+        self.visited_states = game.visited_states
+        self.current_color = game.current_color
+        self.zobrist_key = game.zobrist_key
+        self.total_cost = game.total_cost
+        self.manhattan_total = game.manhattan_total
+        self.free = 0
+        for cell, value in enumerate(game.grid):
+            if value == 0:
+                self.free |= 1 << cell
+
+    @property
+    def grid(self) -> bytearray:
+        """Byte grid rebuilt from the bitboards (display and manual play only)"""
+        grid = bytearray(self.spec.initial_grid)
+        for color, bits in self.occupancy.items():
+            while bits:
+                low = bits & -bits
+                grid[low.bit_length() - 1] = color
+                bits ^= low
+        return grid
+
+    @grid.setter
+    def grid(self, grid):
+        self.free = 0
+        for cell, value in enumerate(grid):
+            if value == 0:
+                self.free |= 1 << cell
+
+    def GetColorMoves(self, color: int) -> List[tuple]:
+        moves = []
+
+        if color in self.completed_colors:
+            return moves
+
+        spec = self.spec
+        end = spec.ends[color]
+        head = self.trails[color][0]
+        allowed = self.tables.cell_neighbors[head] & (self.free | (1 << end))
+        weights = spec.weights
+
+        # Walk the precomputed neighbour order so both backends branch identically
+        for nxt in spec.neighbors[head]:
+            if (allowed >> nxt) & 1:
+                moves.append((color, nxt, weights[nxt]))
+
+        return moves
+
+    def _reserved_cells(self) -> Optional[dict]:
+        reserved = {}
+        spec = self.spec
+        cell_neighbors = self.tables.cell_neighbors
+
+        for color in spec.colors:
+            if color in self.completed_colors:
+                continue
+
+            end_neighbors = cell_neighbors[spec.ends[color]]
+            if (end_neighbors >> self.trails[color][0]) & 1:
+                continue
+
+            sides = end_neighbors & self.free
+            if not sides:
+                return None
+            if sides & (sides - 1) == 0:
+                cell = sides.bit_length() - 1
+                if cell in reserved:
+                    return None
+                reserved[cell] = color
+
+        return reserved
+
+    def _copy_cells(self, new_game: 'BitboardGame'):
+        new_game.tables = self.tables
+        new_game.free = self.free
+
+    def _fill_cell(self, cell: int, color: int):
+        self.free ^= 1 << cell
+
+    def _clear_cell(self, cell: int):
+        self.free |= 1 << cell
+
+    def IsDeadEnd(self) -> bool:
+        spec = self.spec
+        tables = self.tables
+        cell_neighbors = tables.cell_neighbors
+        free = self.free
+
+        for color in spec.colors:
+            if color in self.completed_colors:
+                continue
+
+            head = self.trails[color][0]
+            end_neighbors = cell_neighbors[spec.ends[color]]
+            if (end_neighbors >> head) & 1:
+                continue
+
+            target = end_neighbors & free
+            reach = cell_neighbors[head] & free
+            while not reach & target:
+                grown = (reach | tables.spread(reach)) & free
+                if grown == reach:
+                    return True
+                reach = grown
+
+        return False
+
+    def IsDeadEndAfterMove(self, color: int, cell: int) -> bool:
+        # Completing a color fills no cell; otherwise the bitboard flood fill is cheap enough to redo
+        if cell == self.spec.ends[color]:
+            return False
+        return self.IsDeadEnd()
+
+    def resetGame(self):
+        super().resetGame()
+        self.free = self.tables.initial_free
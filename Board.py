@@ -1,4 +1,5 @@
 import numpy as np
+import random
 
 class Board:
     
@@ -7,12 +8,30 @@ class Board:
         self.rows = num_rows
         self.num_colors = num_colors
         self.grid = np.zeros(self.rows * self.cols, dtype=np.uint8)
-        self.weights = np.ones(self.rows * self.cols, dtype=int)   
+        self.weights = np.ones(self.rows * self.cols, dtype=float)
         self.positions = {}
+        self.zobrist = {}
+        self._build_adjacency()
     
     def _index(self, row, col):
         return row * self.cols + col
     
+    def _build_adjacency(self):
+        """
+        Flat CSR neighbour table, built once: the neighbours of cell i are
+        neighbor_cells[neighbor_start[i]:neighbor_start[i + 1]], in UP, DOWN,
+        LEFT, RIGHT order, already bounds-checked.
+        """
+        self.neighbor_start = [0]
+        self.neighbor_cells = []
+        for row in range(self.rows):
+            for col in range(self.cols):
+                for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+                    nr, nc = row + dr, col + dc
+                    if 0 <= nr < self.rows and 0 <= nc < self.cols:
+                        self.neighbor_cells.append(self._index(nr, nc))
+                self.neighbor_start.append(len(self.neighbor_cells))
+    
     def set_weights_manually(self):
         print("Default weight for all cells is 1.0")
         choice = input("enter new weights (or default all ones)? (y/n): ").lower()
@@ -35,6 +54,15 @@ class Board:
             print("\nWeights set successfully!")
             self.print_weights()
     
+    def set_weights(self, weights):
+        """Set all cell weights from a flat row-major sequence (non-interactive)"""
+        if len(weights) != self.rows * self.cols:
+            raise ValueError(f"Expected {self.rows * self.cols} weights, got {len(weights)}")
+        for idx, weight in enumerate(weights):
+            if weight < 0:
+                raise ValueError("Weight must be positive")
+            self.weights[idx] = weight
+    
     def print_weights(self):
         """Display the weight grid"""
         print("\n=== WEIGHT GRID ===")
@@ -46,18 +74,34 @@ class Board:
             print(row)
         print()
     
+    def get_zobrist_keys(self, color):
+        """Return (cell_keys, head_keys) 64-bit Zobrist tables for a color"""
+        keys = self.zobrist.get(color)
+        if keys is None:
+            # Seeded per color so keys are stable between runs and processes
+            rng = random.Random(f"zobrist-{color}")
+            size = self.rows * self.cols
+            cell_keys = [rng.getrandbits(64) for _ in range(size)]
+            head_keys = [rng.getrandbits(64) for _ in range(size)]
+            keys = (cell_keys, head_keys)
+            self.zobrist[color] = keys
+        return keys
+    
     def get_weight(self, row, col):
         """Get weight of a specific cell"""
         return self.weights[self._index(row, col)]
     
-    def printGrid(self):
+    def printGrid(self, grid=None):
+        # A Game passes its own grid; the board's grid is the initial puzzle
+        if grid is None:
+            grid = self.grid
         horiz = '+' + '----+' * self.cols
         print("\n")
         for i in range(self.rows):
             print(horiz)
             row = '|'
             for j in range(self.cols):
-                cell_val = self.grid[self._index(i, j)]
+                cell_val = grid[self._index(i, j)]
                 display = ' ' if cell_val == 0 else str(cell_val)
                 row += f'  {display} |'
             print(row)
@@ -118,6 +162,29 @@ class Board:
         self.positions = positions
         return positions
     
+    def set_positions(self, positions):
+        """
+        Non-interactive placeForColor: positions maps color -> {"start": [r, c], "end": [r, c]}.
+        """
+        occupied = set()
+        for color, coord in positions.items():
+            if not 1 <= color <= 255:
+                raise ValueError(f"Color {color} must be in 1..255")
+            for key in ("start", "end"):
+                row, col = coord[key]
+                if not self.isValidPosition(row, col):
+                    raise ValueError(f"{key} of color {color} is outside the board")
+                if (row, col) in occupied:
+                    raise ValueError(f"Cell ({row},{col}) occupied")
+                occupied.add((row, col))
+        
+        positions = {color: {"start": list(coord["start"]), "end": list(coord["end"])}
+                     for color, coord in positions.items()}
+        self.grid.fill(0)
+        self._addNumbersToGrid(positions)
+        self.positions = positions
+        return positions
+    
     def _addNumbersToGrid(self, positions):
         for color, coord in positions.items():
             s = coord["start"]
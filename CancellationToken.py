@@ -0,0 +1,24 @@
+import threading
+
+class CancellationToken:
+    """
+    Cooperative stop signal for a running solver. Call cancel() from another
+    thread (or a signal handler); the solver notices at its next budget check
+    and returns a "cancelled" result. Any object with is_set(), such as a
+    multiprocessing.Event, can be passed to a solver in its place.
+    """
+
+    __slots__ = ('_event',)
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
@@ -0,0 +1,119 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import Dict
+
+CHECKPOINT_MAGIC = b"NLCK"
+CHECKPOINT_VERSION = 1
+
+# Magic, version byte, then the length of the JSON header
+_PREAMBLE = struct.Struct("<4sBI")
+
+# Sections start on 8-byte boundaries so they can be viewed as 64-bit arrays in place
+_ALIGN = 8
+
+def write_checkpoint(path: str, meta: dict, sections: Dict[str, array]):
+    """
+    Write a checkpoint: a JSON header (meta plus the typecode, offset and
+    length of every section) followed by the raw, aligned section arrays.
+    The file is written beside `path` and renamed over it, so a crash
+    mid-write leaves the previous checkpoint intact.
+    """
+    layout = {}
+    offset = 0
+    for name, data in sections.items():
+        nbytes = len(data) * data.itemsize
+        layout[name] = {"typecode": data.typecode, "offset": offset, "nbytes": nbytes}
+        offset += (nbytes + _ALIGN - 1) // _ALIGN * _ALIGN
+    header = json.dumps({"meta": meta, "sections": layout, "byteorder": sys.byteorder}).encode()
+
+    start = (_PREAMBLE.size + len(header) + _ALIGN - 1) // _ALIGN * _ALIGN
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(_PREAMBLE.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, len(header)))
+        f.write(header)
+        for name, data in sections.items():
+            f.seek(start + layout[name]["offset"])
+            f.write(data.tobytes())
+        f.truncate(start + offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+class CheckpointReader:
+    """
+    Memory-mapped view of a checkpoint file. section() returns a typed
+    memoryview straight into the mapping, so restoring copies each array
+    once (array.frombytes is a memcpy) instead of parsing it. Use as a
+    context manager; the views are released when it closes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path}: empty checkpoint file")
+        self._buffer = memoryview(self._map)
+        self._views = []
+
+        if len(self._map) < _PREAMBLE.size:
+            self.close()
+            raise ValueError(f"{path}: not a checkpoint file")
+        magic, version, header_length = _PREAMBLE.unpack_from(self._map)
+        if magic != CHECKPOINT_MAGIC:
+            self.close()
+            raise ValueError(f"{path}: not a checkpoint file")
+        if version != CHECKPOINT_VERSION:
+            self.close()
+            raise ValueError(f"{path}: unsupported checkpoint version {version}")
+
+        header = json.loads(self._map[_PREAMBLE.size:_PREAMBLE.size + header_length])
+        if header["byteorder"] != sys.byteorder:
+            self.close()
+            raise ValueError(f"{path}: checkpoint written on a {header['byteorder']}-endian machine")
+        self.meta = header["meta"]
+        self._layout = header["sections"]
+        self._start = (_PREAMBLE.size + header_length + _ALIGN - 1) // _ALIGN * _ALIGN
+
+    def __enter__(self) -> 'CheckpointReader':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._layout
+
+    def _raw(self, name: str) -> memoryview:
+        entry = self._layout[name]
+        start = self._start + entry["offset"]
+        raw = self._buffer[start:start + entry["nbytes"]]
+        self._views.append(raw)
+        return raw
+
+    def section(self, name: str) -> memoryview:
+        """Typed view of a section, valid until the reader closes"""
+        view = self._raw(name).cast(self._layout[name]["typecode"])
+        self._views.append(view)
+        return view
+
+    def array(self, name: str) -> array:
+        """Copy of a section as an array (one memcpy from the mapping)"""
+        data = array(self._layout[name]["typecode"])
+        data.frombytes(self._raw(name))
+        return data
+
+    def close(self):
+        # Casts before the slices they were made from
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._buffer.release()
+        self._map.close()
+        self._file.close()
@@ -1,26 +1,36 @@
 from Game import Game
 from BaseSolver import BaseSolver
+from NodeTable import NodeTable
 from typing import Optional
 
 class DFS_Solver(BaseSolver):
     
-    def __init__(self, initial_game: Game, max_nodes=None):
-        super().__init__(initial_game, max_nodes)
+    def __init__(self, initial_game: Game, max_nodes=None, in_place=False, **options):
+        super().__init__(initial_game, max_nodes, **options)
         self.max_depth = 0
+        self.max_stack_size = 0
+        # In-place mode mutates one Game with ApplyMove/UndoMove instead of copying states
+        self.in_place = in_place
     
     def solve(self) -> Optional[Game]:
         print("\nStarting DFS Search...")
         print(f"Board: {self.initial_game.board.rows}x{self.initial_game.board.cols}, Colors: {len(self.initial_game.board.positions)}")
         
-        self.visited_count = 0
+        self._start_budget()
         self.max_depth = 0
+        self.max_stack_size = 0
         self.solution_found = None
         self.solution_path = []
-        self.parent_map = {}
+        self.solution_moves = []
+        self.nodes = NodeTable()
         
         self.initial_game.visited_states.clear()
-        result = self._dfs_iterative()
+        if self.in_place:
+            result = self._dfs_in_place()
+        else:
+            result = self._dfs_iterative()
         
+        self._finish_progress()
         print(f"\nDFS Complete: {self.visited_count:,} states visited, max depth: {self.max_depth}")
         
         if result:
@@ -31,45 +41,158 @@ class DFS_Solver(BaseSolver):
             return None
     
     def _dfs_iterative(self) -> Optional[Game]:
-        stack = [(self.initial_game, 0)]
-        self.initial_game.MarkAsVisited()
+        root, root_node = self._root()
+        if root is None:
+            return None
         
-        state_hash = self._hash_state(self.initial_game)
-        self.parent_map[state_hash] = None
+        stack = [(root, 0, root_node)]
+        self._frontier = stack
+        root.MarkAsVisited()
         
         while stack:
-            if self.visited_count >= self.max_nodes:
+            if self._budget_exhausted():
                 return None
             
-            current_state, depth = stack.pop()
+            if len(stack) > self.max_stack_size:
+                self.max_stack_size = len(stack)
+            
+            current_state, depth, current_node = stack.pop()
             self.visited_count += 1
+            self._track_best(current_state)
             
             if depth > self.max_depth:
                 self.max_depth = depth
             
             if current_state.IsFinalState():
-                self.solution_found = current_state
-                self._reconstruct_path(current_state)
-                return current_state
+                return self._reconstruct_path(current_node)
             
-            if current_state.IsDeadEnd():
+            # With prune on, every queued state has already passed the check
+            if not self.prune and current_state.IsDeadEnd():
                 continue
             
-            current_hash = self._hash_state(current_state)
-            next_states = current_state.GetPossibleMoves()
-            next_states = self._sort_moves(current_state, next_states)
+            successors = self._expand(current_state)
+            successors = self._sort_moves(current_state, successors)
             
-            for next_state in reversed(next_states):
+            for move, next_state in reversed(successors):
                 next_state.MarkAsVisited()
-                stack.append((next_state, depth + 1))
-                
-                next_hash = self._hash_state(next_state)
-                self.parent_map[next_hash] = current_state
+                stack.append((next_state, depth + 1, self._add_node(current_node, move)))
         
         return None
     
-    def _sort_moves(self, current_state: Game, moves: list) -> list:
-        def score(next_state: Game) -> tuple:
+    def _dfs_in_place(self) -> Optional[Game]:
+        """
+        Backtracking DFS on a single Game: moves are applied and undone in place,
+        so memory grows with depth only. The applied moves form the move log
+        that the solution path is rebuilt from.
+        """
+        game = self.initial_game.CopyState()
+        root_moves = []
+        if self.propagate:
+            root_moves = game.PropagateForcedMoves()
+            if root_moves is None:
+                return None
+        
+        game.MarkAsVisited()
+        self.visited_count += 1
+        
+        if game.IsFinalState():
+            return self._finish_in_place(root_moves, [])
+        if game.IsDeadEnd():
+            return None
+        
+        # Each log entry is the group of moves (chosen move plus forced ones) of one depth
+        move_log = []
+        # One [moves, next_index] frame per depth; frame i+1 belongs to move_log[i]
+        frames = [[self._sort_move_tuples(game, game.GetLegalMoves(self.most_constrained)), 0]]
+        self._frontier = frames
+        
+        while frames:
+            frame = frames[-1]
+            moves, i = frame
+            
+            if i == len(moves):
+                frames.pop()
+                if move_log:
+                    self._undo_group(game, move_log.pop())
+                continue
+            
+            frame[1] = i + 1
+            color, cell, cost = moves[i]
+            game.ApplyMove(color, cell, cost)
+            group = [moves[i]]
+            
+            if self.propagate:
+                forced = game.PropagateForcedMoves()
+                if forced is None:
+                    game.UndoMove(color, cost)
+                    continue
+                group.extend(forced)
+            
+            if game.IsVisitedState():
+                self._undo_group(game, group)
+                continue
+            
+            if self._budget_exhausted():
+                return None
+            
+            game.MarkAsVisited()
+            move_log.append(group)
+            self.visited_count += 1
+            # The game is mutated in place, so an improved state is snapshotted
+            self._track_best(game, copy=True)
+            
+            if len(move_log) > self.max_depth:
+                self.max_depth = len(move_log)
+                # The frames are the only frontier kept in place
+                self.max_stack_size = len(frames)
+            
+            if game.IsFinalState():
+                return self._finish_in_place(root_moves, move_log)
+            
+            if self._is_dead_after(game, group):
+                self._undo_group(game, move_log.pop())
+                continue
+            
+            frames.append([self._sort_move_tuples(game, game.GetLegalMoves(self.most_constrained)), 0])
+        
+        return None
+    
+    def _progress_details(self) -> tuple:
+        """Frontier size (stacked states, or untried moves of the in-place frames) and max depth"""
+        frontier = self._frontier
+        if frontier is None:
+            return 0, None, None, self.max_depth
+        if self.in_place:
+            return sum(len(moves) - i for moves, i in frontier), None, None, self.max_depth
+        return len(frontier), None, None, self.max_depth
+    
+    def _sort_move_tuples(self, game: Game, moves: list) -> list:
+        """Same ordering as _sort_moves, scored from (color, cell, cost) without copying"""
+        coords = game.spec.coords
+        total_dist = 0
+        for color in game.spec.colors:
+            if color in game.completed_colors:
+                continue
+            pos = coords[game.get_head(color)]
+            end = coords[game.spec.ends[color]]
+            total_dist += abs(pos[0] - end[0]) + abs(pos[1] - end[1])
+        
+        def score(move: tuple) -> tuple:
+            color, cell, _ = move
+            head = coords[game.get_head(color)]
+            end = coords[game.spec.ends[color]]
+            pos = coords[cell]
+            completes = 1 if pos == end else 0
+            dist = (total_dist
+                    - (abs(head[0] - end[0]) + abs(head[1] - end[1]))
+                    + (abs(pos[0] - end[0]) + abs(pos[1] - end[1])))
+            return (completes, -dist)
+        
+        return sorted(moves, key=score, reverse=True)
+    
+    def _sort_moves(self, current_state: Game, successors: list) -> list:
+        def score(successor: tuple) -> tuple:
+            next_state = successor[1]
             completes = 0
             for color in next_state.completed_colors:
                 if color not in current_state.completed_colors:
@@ -77,18 +200,17 @@ class DFS_Solver(BaseSolver):
                     break
             
             total_dist = 0
-            for color, path in next_state.paths.items():
+            for color in next_state.spec.colors:
                 if color in next_state.completed_colors:
                     continue
-                if color not in next_state.board.positions:
-                    continue
                 
-                pos = path[-1]
-                end = tuple(next_state.board.positions[color]["end"])
+                pos = next_state.spec.coords[next_state.get_head(color)]
+                end = next_state.spec.coords[next_state.spec.ends[color]]
                 dist = abs(pos[0] - end[0]) + abs(pos[1] - end[1])
                 total_dist += dist
             
-            path_len = sum(len(p) for p in next_state.paths.values())
-            return (completes, -total_dist, -path_len)
+            # Every sibling is one move longer than its parent, so total
+            # path length never breaks ties here and is not scored
+            return (completes, -total_dist)
         
-        return sorted(moves, key=score, reverse=True)
\ No newline at end of file
+        return sorted(successors, key=score, reverse=True)
\ No newline at end of file
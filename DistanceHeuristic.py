@@ -0,0 +1,117 @@
+import heapq
+from typing import Dict, List
+from Game import Game
+from PuzzleSpec import PuzzleSpec
+
+INF = float('inf')
+
+class DistanceHeuristic:
+    """
+    Weighted shortest-path heuristic for A*. For each color, the distance map
+    gives the cheapest cost of reaching its end from any cell: the sum of
+    the weights of the cells entered, end included, which is exactly how
+    Game charges moves. Colors never share cells, so the sum of the
+    per-color distances from the heads never overestimates the remaining
+    cost.
+
+    The static maps route around the other colors' endpoints only and are
+    built once per puzzle. For an expanded state, a color keeps its static
+    map while a cheapest static route from its head is still free;
+    otherwise its map is rebuilt over the state's free cells. Children are
+    scored with the maps of the state they were expanded from. Those maps
+    were built over a superset of each child's free cells, so they stay
+    admissible.
+    """
+
+    def __init__(self, spec: PuzzleSpec):
+        self.spec = spec
+        self.static = {}
+        initial = spec.initial_grid
+        for color in spec.colors:
+            self.static[color] = self._distances(spec.ends[color], initial)
+        self.refreshes = 0
+
+    def _distances(self, end: int, grid) -> List[float]:
+        """
+        Dijkstra from `end` backwards: dist[u] is the cheapest cost of reaching
+        `end` from u through empty cells of `grid`. Filled cells get a
+        distance (they may be a head) but are never passed through.
+        """
+        spec = self.spec
+        neighbors = spec.neighbors
+        weights = spec.weights
+        dist = [INF] * spec.size
+        dist[end] = 0.0
+        queue = [(0.0, end)]
+
+        while queue:
+            d, cell = heapq.heappop(queue)
+            if d > dist[cell]:
+                continue
+            entered = d + weights[cell]
+            for prev in neighbors[cell]:
+                if entered < dist[prev]:
+                    dist[prev] = entered
+                    if grid[prev] == 0:
+                        heapq.heappush(queue, (entered, prev))
+
+        return dist
+
+    def _static_is_exact(self, dist: List[float], head: int, end: int, grid) -> bool:
+        """True if some cheapest static route from `head` to `end` still runs through empty cells only"""
+        spec = self.spec
+        neighbors = spec.neighbors
+        weights = spec.weights
+        cell = head
+        # Zero weights allow flat steps, so bound the walk by the board size
+        for _ in range(spec.size):
+            if cell == end:
+                return True
+            target = dist[cell]
+            for nxt in neighbors[cell]:
+                if (nxt == end or grid[nxt] == 0) and abs(dist[nxt] + weights[nxt] - target) < 1e-9:
+                    cell = nxt
+                    break
+            else:
+                return False
+        return False
+
+    def maps_for(self, state: Game) -> Dict[int, List[float]]:
+        """Distance map of every unfinished color, valid for `state` and all of its descendants"""
+        spec = self.spec
+        grid = state.grid
+        maps = {}
+        for color in spec.colors:
+            if color in state.completed_colors:
+                continue
+            end = spec.ends[color]
+            static = self.static[color]
+            if self._static_is_exact(static, state.trails[color][0], end, grid):
+                maps[color] = static
+            else:
+                self.refreshes += 1
+                maps[color] = self._distances(end, grid)
+        return maps
+
+    def estimate(self, state: Game, maps: Dict[int, List[float]]) -> float:
+        """Sum of the distances from each unfinished head (inf if some end is unreachable)"""
+        total = 0.0
+        for color, dist in maps.items():
+            if color not in state.completed_colors:
+                total += dist[state.trails[color][0]]
+        return total
+
+    def estimate_after(self, parent: Game, parent_h: float, state: Game, moves, maps: Dict[int, List[float]]) -> float:
+        """
+        estimate(state, maps) from the parent's estimate under the same maps:
+        only the terms of the colors that `moves` extended change. A finished
+        color's head is its end, whose distance is 0.
+        """
+        total = parent_h
+        moved = set()
+        for color, _, _ in moves:
+            if color not in moved:
+                moved.add(color)
+                dist = maps[color]
+                total += dist[state.trails[color][0]] - dist[parent.trails[color][0]]
+        return total
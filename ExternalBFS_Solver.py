@@ -0,0 +1,259 @@
+from Game import Game
+from BaseSolver import BaseSolver
+from NodeTable import NodeTable
+from typing import Iterator, Optional
+import heapq
+import os
+import shutil
+import tempfile
+
+# Bytes read or written per file operation
+IO_BLOCK = 1 << 16
+
+# Python overhead per buffered record: bytes object header plus its list slot
+RECORD_OVERHEAD = 41
+
+# Most run files open at once while merging; more runs are merged in passes
+MERGE_FAN_IN = 64
+
+class ExternalBFS_Solver(BaseSolver):
+    """
+    Breadth-first search with the frontier on disk. Each layer is a file of
+    sorted, unique PackState records. A layer is expanded by streaming its
+    file; children are buffered up to memory_budget megabytes, then sorted
+    and written as a run. The runs are merged into the next layer, dropping
+    duplicates (delayed duplicate detection). No visited set or node table
+    is kept: the solution is rebuilt backwards by scanning the earlier
+    layers for a parent of each state on the path.
+
+    Every move adds one cell to a path, so without propagation a state can
+    only appear in one layer and duplicates are removed within the layer.
+    With propagation, children are also merged against a sorted file of
+    every earlier layer. Layer files go to a temporary directory that is
+    removed afterwards, or to `work_dir`, where they are kept.
+    """
+
+    def __init__(self, initial_game: Game, max_nodes=None, memory_budget=64, work_dir=None, **options):
+        super().__init__(initial_game, max_nodes, **options)
+        self.memory_budget = memory_budget
+        self.work_dir = work_dir
+        self.record_size = len(self.initial_game.PackState())
+        self.layer = 0
+        self.layer_size = 0
+        self.max_queue_size = 0
+        self.runs_written = 0
+        self.duplicates = 0
+        self.bytes_written = 0
+
+    def solve(self) -> Optional[Game]:
+        print("\nStarting External-Memory BFS Search...")
+        print(f"Board: {self.initial_game.board.rows}x{self.initial_game.board.cols}, Colors: {len(self.initial_game.board.positions)}")
+
+        self._start_budget()
+        self.layer = 0
+        self.layer_size = 0
+        self.max_queue_size = 0
+        self.runs_written = 0
+        self.duplicates = 0
+        self.bytes_written = 0
+        self.solution_found = None
+        self.solution_path = []
+        self.solution_moves = []
+        self.nodes = NodeTable()
+
+        # Duplicates are detected on disk; the shared visited set stays empty
+        self.initial_game.visited_states.clear()
+        if self.work_dir is None:
+            directory = tempfile.mkdtemp(prefix="numberlink-bfs-")
+        else:
+            directory = self.work_dir
+            os.makedirs(directory, exist_ok=True)
+        try:
+            result = self._external_bfs(directory)
+        finally:
+            if self.work_dir is None:
+                shutil.rmtree(directory, ignore_errors=True)
+
+        self._finish_progress()
+        print(f"\nExternal BFS Complete: {self.visited_count:,} states visited, {self.layer} layers, "
+              f"largest layer: {self.max_queue_size:,}, duplicates removed: {self.duplicates:,}, "
+              f"written: {self.bytes_written / 1e6:.1f} MB")
+
+        if result:
+            print("Solution found!")
+            return result
+        else:
+            print("No solution found")
+            return None
+
+    def _external_bfs(self, directory: str) -> Optional[Game]:
+        root, root_node = self._root()
+        if root is None:
+            return None
+        # Forced moves of the root are the only ones kept in the node table
+        root_moves = self._moves_to_node(root_node)
+
+        layers = [self._layer_path(directory, 0)]
+        self._write_records(layers[0], [root.PackState()])
+        seen = os.path.join(directory, "seen.bin") if self.propagate else None
+        if seen is not None:
+            shutil.copyfile(layers[0], seen)
+        self.layer_size = 1
+
+        while self.layer_size:
+            self.max_queue_size = max(self.max_queue_size, self.layer_size)
+            runs = []
+            buffer = []
+            limit = max(1, int(self.memory_budget * 1024 * 1024 / (self.record_size + RECORD_OVERHEAD)))
+
+            for record in self._read_records(layers[-1]):
+                if self._budget_exhausted():
+                    return None
+
+                state = root.UnpackState(record)
+                self.visited_count += 1
+                self._track_best(state)
+
+                if state.IsFinalState():
+                    return self._rebuild(root, root_moves, layers, record)
+
+                for _, next_state in self._expand(state):
+                    buffer.append(next_state.PackState())
+                if len(buffer) >= limit:
+                    runs.append(self._write_run(directory, buffer))
+                    buffer = []
+
+            if buffer:
+                runs.append(self._write_run(directory, buffer))
+                buffer = []
+
+            self.layer += 1
+            layers.append(self._layer_path(directory, self.layer))
+            self.layer_size = self._merge_runs(runs, layers[-1], seen)
+
+        return None
+
+    def _layer_path(self, directory: str, layer: int) -> str:
+        return os.path.join(directory, f"layer-{layer:05d}.bin")
+
+    def _write_records(self, path: str, records) -> int:
+        """Write records in order, return how many"""
+        count = 0
+        block = []
+        with open(path, "wb") as f:
+            for record in records:
+                block.append(record)
+                if len(block) * self.record_size >= IO_BLOCK:
+                    f.write(b"".join(block))
+                    count += len(block)
+                    block = []
+            f.write(b"".join(block))
+            count += len(block)
+        self.bytes_written += count * self.record_size
+        return count
+
+    def _read_records(self, path: str) -> Iterator[bytes]:
+        size = self.record_size
+        block_size = max(1, IO_BLOCK // size) * size
+        with open(path, "rb") as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    return
+                for offset in range(0, len(block), size):
+                    yield block[offset:offset + size]
+
+    def _run_path(self, directory: str) -> str:
+        path = os.path.join(directory, f"run-{self.runs_written:06d}.bin")
+        self.runs_written += 1
+        return path
+
+    def _write_run(self, directory: str, buffer: list) -> str:
+        """Sort the buffered children, drop repeats and write them as a run file"""
+        buffer.sort()
+        path = self._run_path(directory)
+        self._write_records(path, self._unique(buffer))
+        return path
+
+    def _unique(self, records) -> Iterator[bytes]:
+        """Sorted records without repeats (counted as duplicates)"""
+        previous = None
+        for record in records:
+            if record == previous:
+                self.duplicates += 1
+                continue
+            previous = record
+            yield record
+
+    def _merge(self, runs: list) -> Iterator[bytes]:
+        """Sorted, unique records of the sorted run files"""
+        return self._unique(heapq.merge(*(self._read_records(run) for run in runs)))
+
+    def _merge_runs(self, runs: list, layer_path: str, seen: Optional[str]) -> int:
+        """
+        Merge the sorted runs into the next layer file, minus states in `seen`,
+        and remove them; returns the layer size. At most MERGE_FAN_IN runs are
+        open at once: with more, groups of them are first merged into larger
+        runs, pass by pass.
+        """
+        directory = os.path.dirname(layer_path)
+        while len(runs) > MERGE_FAN_IN:
+            merged_runs = []
+            for start in range(0, len(runs), MERGE_FAN_IN):
+                group = runs[start:start + MERGE_FAN_IN]
+                if len(group) == 1:
+                    merged_runs.append(group[0])
+                    continue
+                path = self._run_path(directory)
+                self._write_records(path, self._merge(group))
+                for run in group:
+                    os.remove(run)
+                merged_runs.append(path)
+            runs = merged_runs
+
+        merged = self._merge(runs)
+        if seen is None:
+            count = self._write_records(layer_path, merged)
+        else:
+            count = self._write_records(layer_path, self._subtract(merged, self._read_records(seen)))
+            # Fold the new layer into the seen file for the layers after it
+            updated = seen + ".tmp"
+            self._write_records(updated, heapq.merge(self._read_records(seen), self._read_records(layer_path)))
+            os.replace(updated, seen)
+
+        for run in runs:
+            os.remove(run)
+        return count
+
+    def _subtract(self, records, seen) -> Iterator[bytes]:
+        """Sorted records that are not in the sorted `seen` stream"""
+        other = next(seen, None)
+        for record in records:
+            while other is not None and other < record:
+                other = next(seen, None)
+            if record == other:
+                self.duplicates += 1
+                continue
+            yield record
+
+    def _rebuild(self, root: Game, root_moves: list, layers: list, record: bytes) -> Game:
+        """Walk back through the layer files from the goal record, one parent per layer, and replay the moves"""
+        groups = []
+        for layer in reversed(layers[:-1]):
+            for parent_record in self._read_records(layer):
+                parent = root.UnpackState(parent_record)
+                group = next((moves for moves, child in self._expand(parent) if child.PackState() == record), None)
+                if group is not None:
+                    groups.append(group)
+                    record = parent_record
+                    break
+
+        moves = list(root_moves)
+        for group in reversed(groups):
+            moves.extend(group)
+        self.solution_found = self._replay_moves(moves)
+        return self.solution_found
+
+    def _progress_details(self) -> tuple:
+        """States in the layer being expanded, and its depth"""
+        return self.layer_size, None, None, self.layer
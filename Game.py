@@ -1,71 +1,263 @@
-from typing import List, Optional
+import struct
+from typing import Dict, List, Optional
 from Board import Board
+from PuzzleSpec import PuzzleSpec
 
 class Game:
+    # A search state only owns its packed grid, path trails and costs;
+    # everything static lives in the PuzzleSpec shared by all states.
+    __slots__ = ('board', 'spec', 'grid', 'trails', 'occupancy', 'path_costs', 'completed_colors',
+                 'visited_states', 'current_color', 'zobrist_key', 'total_cost', 'manhattan_total')
+    
     def __init__(self, board: Board):
         self.board = board
-        self.paths = {}
+        self.spec = PuzzleSpec(board)
+        self.grid = bytearray(self.spec.initial_grid)
+        # Each trail is a persistent linked list (cell, previous_trail) of cell
+        # indices, so copies share path prefixes instead of duplicating them
+        self.trails = {}
+        # Per-color bitmask of the cells on the color's path (bit i = cell i)
+        self.occupancy = {}
         self.path_costs = {}  # NEW: For UCS
         self.visited_states = set()
         self.current_color: Optional[int] = None
         self.completed_colors = set()
 
-        for color, pos in self.board.positions.items():
-            self.paths[color] = [tuple(pos["start"])]
+        for color in self.spec.colors:
+            self.trails[color] = (self.spec.starts[color], None)
+            self.occupancy[color] = 1 << self.spec.starts[color]
             self.path_costs[color] = 0.0  # NEW: For UCS
+        self._reset_totals()
+        self.zobrist_key = self._compute_zobrist_key()
+    
+    def _reset_totals(self):
+        """
+        Running totals kept up to date by ApplyMove/UndoMove: the path cost g
+        and the Manhattan distance of every unfinished head to its end (a
+        finished color's head is its end, so it adds 0)
+        """
+        self.total_cost = sum(self.path_costs.values())
+        manhattan = self.spec.manhattan
+        self.manhattan_total = sum(manhattan[color][trail[0]] for color, trail in self.trails.items())
     
     def _idx(self, row, col):
-        return row * self.board.cols + col
+        return row * self.spec.cols + col
+    
+    def _compute_zobrist_key(self) -> int:
+        """Full Zobrist key of filled cells and path heads (used once per root state)"""
+        key = 0
+        for idx, cell in enumerate(self.grid):
+            if cell != 0:
+                key ^= self.spec.zobrist[cell][0][idx]
+        for color, trail in self.trails.items():
+            key ^= self.spec.zobrist[color][1][trail[0]]
+        return key
+    
+    @property
+    def paths(self) -> Dict[int, List[tuple]]:
+        """Full (row, col) path of every color from start to head (materialised on demand)"""
+        coords = self.spec.coords
+        paths = {}
+        for color, trail in self.trails.items():
+            path = []
+            while trail is not None:
+                path.append(coords[trail[0]])
+                trail = trail[1]
+            path.reverse()
+            paths[color] = path
+        return paths
+    
+    def get_head(self, color: int) -> int:
+        """Cell index of a color's path head"""
+        return self.trails[color][0]
+    
+    def IsOnPath(self, color: int, cell: int) -> bool:
+        """O(1) test whether a cell is part of a color's current path"""
+        return (self.occupancy[color] >> cell) & 1 == 1
+    
+    def printGrid(self):
+        self.board.printGrid(self.grid)
     
     #   For UCS
     def get_total_cost(self) -> float:
-        return sum(self.path_costs.values())
+        return self.total_cost
     
-    def GetPossibleMoves(self) -> List['Game']:
-        next_states = []
+    def GetColorMoves(self, color: int) -> List[tuple]:
+        """Legal (color, cell, cost) moves that extend one color's path"""
+        moves = []
         
-        for color, path in self.paths.items():
+        if color in self.completed_colors:
+            return moves
+        
+        spec = self.spec
+        end = spec.ends[color]
+        grid = self.grid
+        weights = spec.weights
+        
+        # Cells already on a path are non-zero in the grid, so in this hot loop
+        # the grid check alone rules out revisiting the color's own path
+        for nxt in spec.neighbors[self.trails[color][0]]:
+            cell = grid[nxt]
+            
+            if cell == 0 or (nxt == end and cell == color):
+                #  weight for UCS
+                moves.append((color, nxt, weights[nxt]))
+        
+        return moves
+    
+    def GetLegalMoves(self, most_constrained: bool = False) -> List[tuple]:
+        """
+        Legal (color, cell, cost) moves from this state, without copying it.
+        With most_constrained, only the moves of the unfinished color with the
+        fewest options are returned: every color has to be finished anyway, so
+        branching on one color at a time loses no solutions and avoids
+        generating every interleaving of the same paths.
+        """
+        if not most_constrained:
+            moves = []
+            for color in self.spec.colors:
+                moves.extend(self.GetColorMoves(color))
+            return moves
+        
+        best = None
+        for color in self.spec.colors:
             if color in self.completed_colors:
                 continue
+            moves = self.GetColorMoves(color)
+            if best is None or len(moves) < len(best):
+                best = moves
+                if len(best) <= 1:
+                    break
+        return best if best is not None else []
+    
+    def GetSuccessors(self, propagate: bool = False, most_constrained: bool = False) -> List[tuple]:
+        """
+        (moves, next_state) pairs for every unvisited successor. With propagate,
+        forced moves are applied to each child and appended to its moves, and
+        children that propagation proves unsolvable are dropped.
+        """
+        successors = []
+        
+        for move in self.GetLegalMoves(most_constrained):
+            color, cell, move_cost = move
             
-            cur = path[-1]
-            end = tuple(self.board.positions[color]["end"])
-            
-            if cur == end:
+            if propagate:
+                new_state = self.CopyState()
+                new_state.ApplyMove(color, cell, move_cost)
+                forced = new_state.PropagateForcedMoves()
+                if forced is not None and not new_state.IsVisitedState():
+                    successors.append(([move] + forced, new_state))
                 continue
             
-            for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
-                nr, nc = cur[0] + dr, cur[1] + dc
-                
-                if not (0 <= nr < self.board.rows and 0 <= nc < self.board.cols):
+            self.ApplyMove(color, cell, move_cost)
+            
+            if not self.IsVisitedState():
+                self.UndoMove(color, move_cost)
+                new_state = self.CopyState()
+                new_state.ApplyMove(color, cell, move_cost)
+                successors.append(((move,), new_state))
+            else:
+                self.UndoMove(color, move_cost)
+        
+        return successors
+    
+    def PropagateForcedMoves(self) -> Optional[List[tuple]]:
+        """
+        Apply, in place, moves that every solution from this state has to make,
+        until none are left. Forced moves are:
+          - a head next to its own end completes the color (no detour is ever cheaper)
+          - a head with a single usable neighbour takes it
+        A neighbour is unusable when it is the last free side of another color's
+        end, since entering it would cut that end off.
+        Returns the applied (color, cell, cost) moves, or None when some color can
+        no longer be connected, in which case the state is left unchanged.
+        """
+        applied = []
+        spec = self.spec
+        
+        while True:
+            reserved = self._reserved_cells()
+            if reserved is None:
+                break
+            
+            forced = None
+            for color in spec.colors:
+                if color in self.completed_colors:
                     continue
                 
-                cell = self.board.grid[self._idx(nr, nc)]
+                end = spec.ends[color]
+                options = []
+                for move in self.GetColorMoves(color):
+                    cell = move[1]
+                    if cell == end:
+                        options = [move]
+                        break
+                    owner = reserved.get(cell)
+                    if owner is None or owner == color:
+                        options.append(move)
                 
-                if cell == 0 or ((nr, nc) == end and cell == color):
-                    if (nr, nc) not in path:
-                        #  weight for UCS
-                        move_cost = self.board.get_weight(nr, nc) if hasattr(self.board, 'get_weight') else 1.0
-                        
-                        self.ApplyMove(color, (nr, nc), move_cost)
-                        
-                        if not self.IsVisitedState():
-                            self.UndoMove(color, move_cost)
-                            new_state = self.CopyState()
-                            new_state.ApplyMove(color, (nr, nc), move_cost)
-                            next_states.append(new_state)
-                        else:
-                            self.UndoMove(color, move_cost)
-        
-        return next_states
+                if not options:
+                    reserved = None
+                    break
+                if len(options) == 1:
+                    forced = options[0]
+                    break
+            
+            if reserved is None:
+                break
+            if forced is None:
+                return applied
+            
+            self.ApplyMove(*forced)
+            applied.append(forced)
+        
+        # Contradiction: restore the state the caller gave us
+        for color, _, cost in reversed(applied):
+            self.UndoMove(color, cost)
+        return None
+    
+    def _reserved_cells(self) -> Optional[dict]:
+        """
+        Map empty cells that are the only way left into some color's end to that
+        color. Returns None if an end is sealed off or two ends need the same cell.
+        """
+        reserved = {}
+        spec = self.spec
+        grid = self.grid
+        
+        for color in spec.colors:
+            if color in self.completed_colors:
+                continue
+            
+            head = self.trails[color][0]
+            end = spec.ends[color]
+            free_sides = []
+            for cell in spec.neighbors[end]:
+                if cell == head:
+                    free_sides = None
+                    break
+                if grid[cell] == 0:
+                    free_sides.append(cell)
+            
+            if free_sides is None:
+                continue
+            if not free_sides:
+                return None
+            if len(free_sides) == 1:
+                if free_sides[0] in reserved:
+                    return None
+                reserved[free_sides[0]] = color
+        
+        return reserved
+    
+    def GetPossibleMoves(self, propagate: bool = False, most_constrained: bool = False) -> List['Game']:
+        return [state for _, state in self.GetSuccessors(propagate, most_constrained)]
     
     def IsFinalState(self) -> bool:
-        return len(self.completed_colors) == len(self.board.positions)
+        return len(self.completed_colors) == len(self.spec.colors)
     
-    def GetHashOfState(self):
-        grid_bytes = self.board.grid.tobytes()
-        paths_data = tuple((color, path[-1]) for color, path in sorted(self.paths.items()))
-        return (grid_bytes, paths_data)
+    def GetHashOfState(self) -> int:
+        return self.zobrist_key
     
     def IsVisitedState(self) -> bool:
         return self.GetHashOfState() in self.visited_states
@@ -74,97 +266,270 @@ class Game:
         self.visited_states.add(self.GetHashOfState())
     
     def CopyState(self) -> 'Game':
-        new_board = Board(self.board.cols, self.board.rows, self.board.num_colors)
-        new_board.grid = self.board.grid.copy()
-        new_board.positions = self.board.positions
-        
-        # NEW: Copy weights if they exist (for UCS)
-        if hasattr(self.board, 'weights'):
-            new_board.weights = self.board.weights.copy()
-        
-        new_game = Game.__new__(Game)
-        new_game.board = new_board
-        new_game.paths = {color: path.copy() for color, path in self.paths.items()}
+        cls = type(self)
+        new_game = cls.__new__(cls)
+        new_game.board = self.board
+        new_game.spec = self.spec
+        self._copy_cells(new_game)
+        new_game.trails = self.trails.copy()
+        new_game.occupancy = self.occupancy.copy()
         new_game.path_costs = self.path_costs.copy()  # NEW: For UCS
         new_game.completed_colors = self.completed_colors.copy()
         new_game.visited_states = self.visited_states
         new_game.current_color = self.current_color
+        new_game.zobrist_key = self.zobrist_key
+        new_game.total_cost = self.total_cost
+        new_game.manhattan_total = self.manhattan_total
         
         return new_game
     
-    def ApplyMove(self, color: int, pos: tuple, cost: float = 1.0):  # NEW: cost parameter
-        end = tuple(self.board.positions[color]["end"])
-        self.paths[color].append(pos)
+    # Cell storage hooks: the only part of copying and moving that differs
+    # between backends (BitboardGame keeps a free-cell mask instead of a grid)
+    def _copy_cells(self, new_game: 'Game'):
+        new_game.grid = self.grid[:]
+    
+    def _fill_cell(self, cell: int, color: int):
+        self.grid[cell] = color
+    
+    def _clear_cell(self, cell: int):
+        self.grid[cell] = 0
+    
+    def PackState(self) -> bytes:
+        """
+        Fixed-size record of the searchable state: the grid bytes, then each
+        color's head as a little-endian uint16. Two states with the same
+        record have the same future and cost (like the Zobrist key).
+        """
+        spec = self.spec
+        return bytes(self.grid) + struct.pack(f"<{len(spec.colors)}H", *(self.trails[color][0] for color in spec.colors))
+    
+    def UnpackState(self, record: bytes) -> 'Game':
+        """
+        Copy of this state (same puzzle and class) loaded from a PackState
+        record. Trails keep only the heads, so moves can be applied and undone
+        but `paths` is not the full path; replay moves for that.
+        """
+        spec = self.spec
+        grid = bytearray(record[:spec.size])
+        heads = struct.unpack_from(f"<{len(spec.colors)}H", record, spec.size)
+        weights = spec.weights
+        
+        state = self.CopyState()
+        state.trails = {}
+        state.occupancy = {}
+        state.path_costs = {}
+        state.completed_colors = set()
+        for color, head in zip(spec.colors, heads):
+            state.trails[color] = (head, None)
+            state.occupancy[color] = 1 << spec.starts[color]
+            state.path_costs[color] = 0.0
+            if head == spec.ends[color]:
+                state.completed_colors.add(color)
+                state.occupancy[color] |= 1 << head
+                state.path_costs[color] += weights[head]
+        
+        # Path cells entered so far: filled cells other than the endpoints
+        for cell, color in enumerate(grid):
+            if color and cell != spec.starts[color] and cell != spec.ends[color]:
+                state.occupancy[color] |= 1 << cell
+                state.path_costs[color] += weights[cell]
+        
+        state.grid = grid
+        state._reset_totals()
+        state.zobrist_key = state._compute_zobrist_key()
+        return state
+    
+    def ApplyMove(self, color: int, cell: int, cost: float = 1.0):  # NEW: cost parameter
+        cell_keys, head_keys = self.spec.zobrist[color]
+        trail = self.trails[color]
+        self.zobrist_key ^= head_keys[trail[0]] ^ head_keys[cell]
+        self.trails[color] = (cell, trail)
+        self.occupancy[color] |= 1 << cell
         self.path_costs[color] += cost  # NEW: Track cost
+        self.total_cost += cost
+        manhattan = self.spec.manhattan[color]
+        self.manhattan_total += manhattan[cell] - manhattan[trail[0]]
         
-        if pos != end:
-            self.board.grid[self._idx(pos[0], pos[1])] = color
+        if cell != self.spec.ends[color]:
+            self._fill_cell(cell, color)
+            self.zobrist_key ^= cell_keys[cell]
         else:
             self.completed_colors.add(color)
     
     def UndoMove(self, color: int, cost: float = 1.0):  # NEW: cost parameter
-        if not self.paths[color]:
+        last, trail = self.trails[color]
+        if trail is None:
             return
         
-        last = self.paths[color].pop()
+        self.trails[color] = trail
+        self.occupancy[color] ^= 1 << last
         self.path_costs[color] -= cost  # NEW: Undo cost
-        end = tuple(self.board.positions[color]["end"])
+        self.total_cost -= cost
+        manhattan = self.spec.manhattan[color]
+        self.manhattan_total += manhattan[trail[0]] - manhattan[last]
+        cell_keys, head_keys = self.spec.zobrist[color]
+        self.zobrist_key ^= head_keys[last] ^ head_keys[trail[0]]
         
-        if last != end:
-            self.board.grid[self._idx(last[0], last[1])] = 0
+        if last != self.spec.ends[color]:
+            self._clear_cell(last)
+            self.zobrist_key ^= cell_keys[last]
         else:
             self.completed_colors.discard(color)
     
     def IsDeadEnd(self) -> bool:
-        for color, path in self.paths.items():
+        """
+        True if some unfinished color can no longer reach its end: its head and
+        its end touch no common region of empty cells (and are not adjacent).
+        """
+        spec = self.spec
+        regions = self._label_free_regions()
+        
+        for color in spec.colors:
             if color in self.completed_colors:
                 continue
             
-            end = tuple(self.board.positions[color]["end"])
-            current = path[-1]
+            head = self.trails[color][0]
+            end_neighbors = spec.neighbors[spec.ends[color]]
             
-            if current != end:
-                er, ec = end
-                end_cell = self.board.grid[self._idx(er, ec)]
-                
-                if end_cell != color and end_cell != 0:
-                    return True
-                
-                free_neighbors = 0
-                for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1)):
-                    nr, nc = er + dr, ec + dc
-                    if 0 <= nr < self.board.rows and 0 <= nc < self.board.cols:
-                        cell = self.board.grid[self._idx(nr, nc)]
-                        if cell == 0 or cell == color:
-                            free_neighbors += 1
-                
-                if free_neighbors == 0:
-                    if abs(current[0] - er) + abs(current[1] - ec) > 1:
-                        return True
+            if head in end_neighbors:
+                continue
+            
+            head_regions = set()
+            for cell in spec.neighbors[head]:
+                region = regions[cell]
+                if region >= 0:
+                    head_regions.add(region)
+            
+            if not any(regions[cell] in head_regions for cell in end_neighbors):
+                return True
         
         return False
     
+    def IsDeadEndAfterMove(self, color: int, cell: int) -> bool:
+        """
+        Incremental IsDeadEnd for a state whose parent was not a dead end and
+        that differs from it by one move of `color` into `cell`. Falls back to
+        the full check only when filling `cell` may have split a region or
+        touches another unfinished color.
+        """
+        spec = self.spec
+        end = spec.ends[color]
+        
+        if cell == end:
+            # The end cell was already filled, so no region changed
+            return False
+        
+        neighbors = spec.neighbors[cell]
+        for other in spec.colors:
+            if other == color or other in self.completed_colors:
+                continue
+            if self.trails[other][0] in neighbors or spec.ends[other] in neighbors:
+                return self.IsDeadEnd()
+        
+        if self._may_split_region(cell):
+            return self.IsDeadEnd()
+        
+        # Only this color's reachability can have changed: search from its new head
+        end_neighbors = spec.neighbors[end]
+        if cell in end_neighbors:
+            return False
+        
+        grid = self.grid
+        seen = {cell}
+        stack = [cell]
+        while stack:
+            cur = stack.pop()
+            for nxt in spec.neighbors[cur]:
+                if nxt in seen or grid[nxt] != 0:
+                    continue
+                if nxt in end_neighbors:
+                    return False
+                seen.add(nxt)
+                stack.append(nxt)
+        
+        return True
+    
+    def _label_free_regions(self) -> List[int]:
+        """Region id of every empty cell (flood fill), -1 for filled cells"""
+        spec = self.spec
+        neighbors = spec.neighbors
+        grid = self.grid
+        regions = [-1] * spec.size
+        region = 0
+        
+        for start in range(spec.size):
+            if grid[start] != 0 or regions[start] >= 0:
+                continue
+            
+            regions[start] = region
+            stack = [start]
+            while stack:
+                for nxt in neighbors[stack.pop()]:
+                    if grid[nxt] == 0 and regions[nxt] < 0:
+                        regions[nxt] = region
+                        stack.append(nxt)
+            region += 1
+        
+        return regions
+    
+    def _may_split_region(self, cell: int) -> bool:
+        """
+        Local cut test for a freshly filled cell: its empty orthogonal neighbours
+        stay connected unless they fall into separate runs of empty cells around
+        the 8-cell ring of `cell`.
+        """
+        grid = self.grid
+        free = [ring_cell >= 0 and grid[ring_cell] == 0 for ring_cell in self.spec.rings[cell]]
+        
+        if all(free):
+            return False
+        
+        # Count runs of empty ring cells that contain an orthogonal neighbour
+        # (even ring positions), walking once around from a filled position
+        start = free.index(False)
+        runs = 0
+        in_run = False
+        has_orthogonal = False
+        for step in range(1, 9):
+            i = (start + step) % 8
+            if free[i]:
+                if not in_run:
+                    in_run = True
+                    has_orthogonal = False
+                if i % 2 == 0:
+                    has_orthogonal = True
+            elif in_run:
+                in_run = False
+                if has_orthogonal:
+                    runs += 1
+        
+        return runs > 1
+    
     def isGameCompleted(self):
         return self.IsFinalState()
     
     def GetCompletionPercentage(self):
-        total = len(self.board.positions)
+        total = len(self.spec.colors)
         done = len(self.completed_colors)
         return (done / total) * 100 if total > 0 else 0.0
     
     def resetGame(self):
-        self.board.resetGrid()
-        self.paths = {}
+        self.grid[:] = self.spec.initial_grid
+        self.trails = {}
+        self.occupancy = {}
         self.path_costs = {}  # NEW: Reset costs
         self.completed_colors = set()
-        for color, pos in self.board.positions.items():
-            self.paths[color] = [tuple(pos["start"])]
+        for color in self.spec.colors:
+            self.trails[color] = (self.spec.starts[color], None)
+            self.occupancy[color] = 1 << self.spec.starts[color]
             self.path_costs[color] = 0.0  # NEW: Initialize cost
+        self._reset_totals()
+        self.zobrist_key = self._compute_zobrist_key()
         self.visited_states.clear()
         self.current_color = None
     
     def choose_color_to_play(self) -> bool:
-        available = [c for c in self.paths if c not in self.completed_colors]
+        available = [c for c in self.trails if c not in self.completed_colors]
         if not available:
             print("No colors remaining.")
             return False
@@ -182,36 +547,36 @@ class Game:
         return True
     
     def getMovesAsDirections(self, color):
-        if color not in self.paths or color in self.completed_colors:
+        if color not in self.trails or color in self.completed_colors:
             return []
         
         dirs = []
-        cur = self.paths[color][-1]
-        end = tuple(self.board.positions[color]["end"])
+        cur = self.spec.coords[self.trails[color][0]]
+        end = self.spec.ends[color]
         
         for direction, (dr, dc) in [("UP", (-1, 0)), ("DOWN", (1, 0)), 
                                       ("LEFT", (0, -1)), ("RIGHT", (0, 1))]:
             nr, nc = cur[0] + dr, cur[1] + dc
             
-            if not (0 <= nr < self.board.rows and 0 <= nc < self.board.cols):
+            if not (0 <= nr < self.spec.rows and 0 <= nc < self.spec.cols):
                 continue
             
-            cell = self.board.grid[self._idx(nr, nc)]
+            idx = self._idx(nr, nc)
+            cell = self.grid[idx]
             
-            if cell == 0 or ((nr, nc) == end and cell == color):
-                if (nr, nc) not in self.paths[color]:
+            if cell == 0 or (idx == end and cell == color):
+                if not self.IsOnPath(color, idx):
                     dirs.append(direction)
         
         return dirs
     
     def printGameStatus(self):
         print("\n=== CURRENT GAME STATE ======")
-        self.board.printGrid()
+        self.printGrid()
         print(f"\nSelected color: {self.current_color}")
         print("\nPaths:")
         for color, path in self.paths.items():
-            end = tuple(self.board.positions[color]["end"])
-            status = "COMPLETE" if path[-1] == end else "INCOMPLETE"
+            status = "COMPLETE" if self.IsOnPath(color, self.spec.ends[color]) else "INCOMPLETE"
             print(f"  Color {color}: Path={path} [{status}]")
         print(f"\nCompletion: {self.GetCompletionPercentage():.2f}%")
         print("========================================================\n")
@@ -229,22 +594,23 @@ class Game:
             return None
 
         dr, dc = deltas[direction]
-        cur = self.paths[self.current_color][-1]
+        cur = self.spec.coords[self.trails[self.current_color][0]]
         nr, nc = cur[0] + dr, cur[1] + dc
 
         if not self.board.isValidPosition(nr, nc):
             return None
 
-        cell = self.board.getCell(nr, nc)
-        end = tuple(self.board.positions[self.current_color]["end"])
+        idx = self._idx(nr, nc)
+        cell = self.grid[idx]
+        end = self.spec.ends[self.current_color]
 
-        if cell == 0 or ((nr, nc) == end and cell == self.current_color):
-            if (nr, nc) in self.paths[self.current_color]:
+        if cell == 0 or (idx == end and cell == self.current_color):
+            if self.IsOnPath(self.current_color, idx):
                 return None
 
-            self.ApplyMove(self.current_color, (nr, nc))
+            self.ApplyMove(self.current_color, idx)
 
-            if (nr, nc) == end:
+            if idx == end:
                 self.current_color = None
                 return "completed"
 
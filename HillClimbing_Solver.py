@@ -1,11 +1,12 @@
 from Game import Game
 from BaseSolver import BaseSolver
+from NodeTable import NodeTable
 from typing import Optional
 
 class HillClimbing_Solver(BaseSolver):
     
-    def __init__(self, initial_game: Game, max_nodes=None):
-        super().__init__(initial_game, max_nodes)
+    def __init__(self, initial_game: Game, max_nodes=None, **options):
+        super().__init__(initial_game, max_nodes, **options)
         self.stuck_at_local_max = False
         self.final_reached_state = None
     
@@ -13,16 +14,18 @@ class HillClimbing_Solver(BaseSolver):
         print("\nStarting Hill Climbing Search...")
         print(f"Board: {self.initial_game.board.rows}x{self.initial_game.board.cols}, Colors: {len(self.initial_game.board.positions)}")
         
-        self.visited_count = 0
+        self._start_budget()
         self.solution_found = None
         self.solution_path = []
-        self.parent_map = {}
+        self.solution_moves = []
+        self.nodes = NodeTable()
         self.stuck_at_local_max = False
         self.final_reached_state = None
         
         self.initial_game.visited_states.clear()
         result = self._hill_climbing_search()
         
+        self._finish_progress()
         print(f"\nHill Climbing Complete: {self.visited_count:,} states visited")
         
         if result:
@@ -37,46 +40,47 @@ class HillClimbing_Solver(BaseSolver):
             return None
     
     def _hill_climbing_search(self) -> Optional[Game]:
-        current_state = self.initial_game
-        current_state.MarkAsVisited()
+        current_state, current_node = self._root()
+        if current_state is None:
+            return None
         
-        state_hash = self._hash_state(current_state)
-        self.parent_map[state_hash] = None
+        current_state.MarkAsVisited()
         
         while True:
-            if self.visited_count >= self.max_nodes:
+            if self._budget_exhausted():
                 self.final_reached_state = current_state
                 return None
             
             self.visited_count += 1
+            self._track_best(current_state)
             
             # Check if we reached the goal
             if current_state.IsFinalState():
-                self.solution_found = current_state
-                self._reconstruct_path(current_state)
-                self.final_reached_state = current_state
-                return current_state
+                self.final_reached_state = self._reconstruct_path(current_node)
+                return self.final_reached_state
             
             # Get current evaluation
             current_eval = self._evaluate(current_state)
             
             # Get all possible next states
-            next_states = current_state.GetPossibleMoves()
+            successors = self._expand(current_state)
             
-            if not next_states:
+            if not successors:
                 # No moves available - stuck
                 self.stuck_at_local_max = True
                 self.final_reached_state = current_state
                 return None
             
             # Find the best neighbor (lowest evaluation = closer to goal)
+            best_move = None
             best_state = None
             best_eval = float('inf')
             
-            for next_state in next_states:
+            for move, next_state in successors:
                 next_eval = self._evaluate(next_state)
                 if next_eval < best_eval:
                     best_eval = next_eval
+                    best_move = move
                     best_state = next_state
             
             # Check if best neighbor is better than current
@@ -87,41 +91,22 @@ class HillClimbing_Solver(BaseSolver):
                 return None
             
             # Move to best neighbor
-            current_hash = self._hash_state(current_state)
             best_state.MarkAsVisited()
-            
-            best_hash = self._hash_state(best_state)
-            self.parent_map[best_hash] = current_state
-            
+            current_node = self._add_node(current_node, best_move)
             current_state = best_state
         
         return None
     
+    def _progress_details(self) -> tuple:
+        """Hill climbing holds one state and moves one level deeper per expansion"""
+        return 1, None, None, max(self.visited_count - 1, 0)
+    
     def _evaluate(self, state: Game) -> float:
         """
-        Calculate sum of Manhattan distances for all incomplete colors.
-        Lower value = closer to goal = better state.
+        Sum of Manhattan distances for all incomplete colors, kept up to date
+        by the state's moves. Lower value = closer to goal = better state.
         """
-        total_distance = 0
-        
-        for color, path in state.paths.items():
-            # Skip completed colors
-            if color in state.completed_colors:
-                continue
-            
-            # Get current position and end position
-            current_pos = path[-1]
-            end_pos = tuple(state.board.positions[color]["end"])
-            
-            # Calculate Manhattan distance
-            manhattan = self._get_manhattan_distance(current_pos, end_pos)
-            total_distance += manhattan
-        
-        return total_distance
-    
-    def _get_manhattan_distance(self, pos1: tuple, pos2: tuple) -> int:
-        """Calculate Manhattan distance between two positions"""
-        return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
+        return state.manhattan_total
     
     def print_solution(self):
         """Print the final solution or last reached state"""
@@ -132,7 +117,7 @@ class HillClimbing_Solver(BaseSolver):
             
             if self.final_reached_state:
                 print("\nLAST REACHED STATE (stuck at local maximum):")
-                self.final_reached_state.board.printGrid()
+                self.final_reached_state.printGrid()
                 
                 print("\nPaths:")
                 for color, path in self.final_reached_state.paths.items():
@@ -150,11 +135,11 @@ class HillClimbing_Solver(BaseSolver):
         print("\nFINAL SOLUTION")
         print("="*60)
         
-        self.solution_found.board.printGrid()
+        self.solution_found.printGrid()
         
         print("\nPaths:")
         for color, path in self.solution_found.paths.items():
             print(f"  Color {color}: {len(path)} moves -> {path}")
         
-        print(f"\nStates explored: {self.visited_count:,}")
+        self._print_search_stats()
         print("="*60)
\ No newline at end of file
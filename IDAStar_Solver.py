@@ -0,0 +1,170 @@
+from Game import Game
+from BaseSolver import BaseSolver
+from DistanceHeuristic import DistanceHeuristic
+from typing import Optional
+
+# Tolerance for comparing float f-costs against the threshold
+EPSILON = 1e-9
+
+class IDAStar_Solver(BaseSolver):
+    """
+    Iterative-deepening A*: repeated depth-first searches on a single Game
+    (moves applied and undone in place), each cut off at an f = g + h
+    threshold that rises to the smallest f that exceeded it. Uses the
+    weighted cost and A*'s distance-map heuristic, so the first solution is
+    cost-optimal while memory stays linear in the depth. A small FIFO
+    transposition table skips states already expanded in the current
+    iteration (the same cells always cost the same, so a repeat adds nothing);
+    transposition_size=0 turns it off.
+    """
+    
+    def __init__(self, initial_game: Game, max_nodes=None, transposition_size=65536, **options):
+        super().__init__(initial_game, max_nodes, **options)
+        self.distances = DistanceHeuristic(self.initial_game.spec)
+        self.transposition_size = transposition_size
+        self.iterations = 0
+        self.threshold = None
+        self.max_depth = 0
+    
+    def solve(self) -> Optional[Game]:
+        print("\nStarting IDA* Search...")
+        print(f"Board: {self.initial_game.board.rows}x{self.initial_game.board.cols}, Colors: {len(self.initial_game.board.positions)}")
+        
+        self._start_budget()
+        self.iterations = 0
+        self.threshold = None
+        self.max_depth = 0
+        self.solution_found = None
+        self.solution_path = []
+        self.solution_moves = []
+        
+        result = self._ida_star()
+        
+        self._finish_progress()
+        print(f"\nIDA* Complete: {self.visited_count:,} states visited, {self.iterations} iterations, "
+              f"final threshold: {self.threshold}")
+        
+        if result:
+            print("Solution found!")
+            return result
+        else:
+            print("No solution found")
+            return None
+    
+    def _ida_star(self) -> Optional[Game]:
+        game = self.initial_game.CopyState()
+        root_moves = []
+        if self.propagate:
+            root_moves = game.PropagateForcedMoves()
+            if root_moves is None:
+                return None
+        
+        if self.prune and game.IsDeadEnd():
+            return None
+        
+        root_maps = self.distances.maps_for(game)
+        threshold = game.get_total_cost() + self.distances.estimate(game, root_maps)
+        
+        while threshold != float('inf'):
+            self.iterations += 1
+            self.threshold = threshold
+            result, threshold = self._bounded_search(game, root_moves, root_maps, threshold)
+            if result is not None or self.stop_reason is not None:
+                return result
+        
+        # No state exceeded the last threshold with a finite f: there is no solution
+        return None
+    
+    def _bounded_search(self, game: Game, root_moves: list, root_maps: dict, threshold: float) -> tuple:
+        """
+        One depth-first pass under `threshold`. Returns (solution or None,
+        smallest f above the threshold); `game` is back at the root afterwards
+        unless a solution or a budget stop ended the pass.
+        """
+        if self._budget_exhausted():
+            return None, threshold
+        self.visited_count += 1
+        if game.IsFinalState():
+            return self._finish_in_place(root_moves, []), threshold
+        
+        distances = self.distances
+        table = {} if self.transposition_size else None
+        next_threshold = float('inf')
+        
+        # Same layout as DFS in place: move_log[i] is the move group that frame i+1 expands
+        move_log = []
+        frames = [[self._order_moves(game, root_maps), 0, root_maps]]
+        self._frontier = frames
+        
+        while frames:
+            frame = frames[-1]
+            moves, i, maps = frame
+            
+            if i == len(moves):
+                frames.pop()
+                if move_log:
+                    self._undo_group(game, move_log.pop())
+                continue
+            
+            frame[1] = i + 1
+            color, cell, cost = moves[i]
+            game.ApplyMove(color, cell, cost)
+            group = [moves[i]]
+            
+            if self.propagate:
+                forced = game.PropagateForcedMoves()
+                if forced is None:
+                    game.UndoMove(color, cost)
+                    continue
+                group.extend(forced)
+            
+            # The parent's maps were built over a superset of this state's free cells
+            f_cost = game.get_total_cost() + distances.estimate(game, maps)
+            if f_cost > threshold + EPSILON:
+                if f_cost < next_threshold:
+                    next_threshold = f_cost
+                self._undo_group(game, group)
+                continue
+            
+            if table is not None:
+                key = game.zobrist_key
+                if key in table:
+                    self._undo_group(game, group)
+                    continue
+                if len(table) >= self.transposition_size:
+                    del table[next(iter(table))]
+                table[key] = None
+            
+            if self._budget_exhausted():
+                return None, next_threshold
+            
+            move_log.append(group)
+            self.visited_count += 1
+            self._track_best(game, copy=True)
+            
+            if len(move_log) > self.max_depth:
+                self.max_depth = len(move_log)
+            
+            if game.IsFinalState():
+                return self._finish_in_place(root_moves, move_log), next_threshold
+            
+            if self.prune and self._is_dead_after(game, group):
+                self._undo_group(game, move_log.pop())
+                continue
+            
+            child_maps = distances.maps_for(game)
+            frames.append([self._order_moves(game, child_maps), 0, child_maps])
+        
+        return None, next_threshold
+    
+    def _order_moves(self, game: Game, maps: dict) -> list:
+        """Legal moves, cheapest estimated f first: the cell's weight plus its distance to the end"""
+        moves = game.GetLegalMoves(self.most_constrained)
+        return sorted(moves, key=lambda move: move[2] + maps[move[0]][move[1]])
+    
+    def _progress_details(self) -> tuple:
+        """Untried moves of the frames, the current threshold as best f, and max depth"""
+        frontier = self._frontier
+        if frontier is None:
+            return 0, self.threshold, None, self.max_depth
+        return sum(len(moves) - i for moves, i, _ in frontier), self.threshold, None, self.max_depth
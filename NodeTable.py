@@ -0,0 +1,50 @@
+from array import array
+
+class NodeTable:
+    """
+    Array-backed search tree. Node i is the move (colors[i], cells[i]) applied
+    to node parents[i]; node 0 is the root (initial state) with parent -1.
+    A few bytes per node replace the Game objects that used to be pinned in parent_map.
+    """
+
+    ROOT = 0
+
+    def __init__(self):
+        self.parents = array('q', [-1])
+        self.colors = array('B', [0])
+        self.cells = array('i', [-1])
+
+    def __len__(self):
+        return len(self.parents)
+
+    def add(self, parent: int, color: int, cell: int) -> int:
+        """Record a child of `parent` reached by moving `color` into `cell`, return its index"""
+        self.parents.append(parent)
+        self.colors.append(color)
+        self.cells.append(cell)
+        return len(self.parents) - 1
+
+    def moves_to(self, index: int) -> list:
+        """(color, cell) moves from the root to node `index`, in play order"""
+        moves = []
+        while index > self.ROOT:
+            moves.append((self.colors[index], self.cells[index]))
+            index = self.parents[index]
+        moves.reverse()
+        return moves
+
+    def depth(self, index: int) -> int:
+        depth = 0
+        while index > self.ROOT:
+            depth += 1
+            index = self.parents[index]
+        return depth
+
+    @classmethod
+    def load(cls, parents, colors, cells) -> 'NodeTable':
+        """Table rebuilt from the three arrays (any buffers of 'q', 'B' and 'i' items), e.g. from a checkpoint"""
+        table = cls.__new__(cls)
+        table.parents = array('q', parents)
+        table.colors = array('B', colors)
+        table.cells = array('i', cells)
+        return table
@@ -5,6 +5,13 @@ from BFS_Solver import BFS_Solver
 from UCS_Solver import UCS_Solver
 from HillClimbing_Solver import HillClimbing_Solver
 from AStar_Solver import AStar_Solver
+from IDAStar_Solver import IDAStar_Solver
+from PortfolioSolver import PortfolioSolver
+from BatchSolver import proves_optimality
+from PuzzleFile import Puzzle
+from SolutionCache import SolutionCache
+import os
+import sqlite3
 import time
 
 class NumberlinkController:
@@ -21,6 +28,44 @@ class NumberlinkController:
         self.hill_time = None
         self.astar_solver = None
         self.astar_time = None
+        self.ida_solver = None
+        self.ida_time = None
+        self.cache = self._open_cache()
+
+    def _open_cache(self):
+        """
+        The solution cache at $NUMBERLINK_CACHE, or None if the variable is
+        unset or empty (the default) or the cache cannot be opened.
+        """
+        path = os.environ.get("NUMBERLINK_CACHE")
+        if not path:
+            return None
+        try:
+            return SolutionCache(path)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Solution cache disabled: {e}")
+            return None
+
+    def _solve(self, solver, name, options):
+        """
+        solver.solve(), unless this board (or a rotated, mirrored or recolored
+        copy) is in the solution cache; optimal solvers only accept a proven
+        optimal entry. New solutions are added to the cache.
+        """
+        if self.cache is None:
+            return solver.solve()
+        puzzle = Puzzle.from_board(self.board)
+        optimal = proves_optimality(name, puzzle.weights, options)
+        hit = self.cache.get(puzzle, require_optimal=optimal)
+        if hit is not None:
+            proven = ", proven optimal" if hit.optimal else ""
+            print(f"\nSolution cache hit (found by {hit.solver}, cost: {hit.cost:.2f}{proven})")
+            return solver.adopt_solution(hit.moves)
+
+        solution = solver.solve()
+        if solution is not None and solution.IsFinalState():
+            self.cache.put(puzzle, solver.solution_moves, name, solution.get_total_cost(), optimal)
+        return solution
 
     def setup_board(self):
         print("\n=== BOARD SETUP ===")
@@ -56,11 +101,11 @@ class NumberlinkController:
         self.board.printGrid()
         return True
 
-    def run_dfs(self, max_nodes=None):
+    def run_dfs(self, max_nodes=None, **options):
         game = Game(self.board)
         start = time.time()
-        solver = DFS_Solver(game, max_nodes=max_nodes)
-        solution = solver.solve()
+        solver = DFS_Solver(game, max_nodes=max_nodes, **options)
+        solution = self._solve(solver, "dfs", options)
         elapsed = time.time() - start
 
         if solution:
@@ -69,11 +114,11 @@ class NumberlinkController:
         
         return solver, elapsed
 
-    def run_bfs(self, max_nodes=None):
+    def run_bfs(self, max_nodes=None, **options):
         game = Game(self.board)
         start = time.time()
-        solver = BFS_Solver(game, max_nodes=max_nodes)
-        solution = solver.solve()
+        solver = BFS_Solver(game, max_nodes=max_nodes, **options)
+        solution = self._solve(solver, "bfs", options)
         elapsed = time.time() - start
 
         if solution:
@@ -82,11 +127,11 @@ class NumberlinkController:
         
         return solver, elapsed
     
-    def run_ucs(self, max_nodes=None):
+    def run_ucs(self, max_nodes=None, **options):
         game = Game(self.board)
         start = time.time()
-        solver = UCS_Solver(game, max_nodes=max_nodes)
-        solution = solver.solve()
+        solver = UCS_Solver(game, max_nodes=max_nodes, **options)
+        solution = self._solve(solver, "ucs", options)
         elapsed = time.time() - start
 
         if solution:
@@ -95,11 +140,11 @@ class NumberlinkController:
         
         return solver, elapsed
     
-    def run_hill_climbing(self, max_nodes=None):
+    def run_hill_climbing(self, max_nodes=None, **options):
         game = Game(self.board)
         start = time.time()
-        solver = HillClimbing_Solver(game, max_nodes=max_nodes)
-        solution = solver.solve()
+        solver = HillClimbing_Solver(game, max_nodes=max_nodes, **options)
+        solution = self._solve(solver, "hill", options)
         elapsed = time.time() - start
 
         # Always print result (even if stuck at local max)
@@ -107,11 +152,11 @@ class NumberlinkController:
         
         return solver, elapsed
     
-    def run_astar(self, max_nodes=None):
+    def run_astar(self, max_nodes=None, **options):
         game = Game(self.board)
         start = time.time()
-        solver = AStar_Solver(game, max_nodes=max_nodes)
-        solution = solver.solve()
+        solver = AStar_Solver(game, max_nodes=max_nodes, **options)
+        solution = self._solve(solver, "astar", options)
         elapsed = time.time() - start
 
         if solution:
@@ -119,7 +164,44 @@ class NumberlinkController:
             solver.print_solution()
         
         return solver, elapsed
+    
+    def run_ida_star(self, max_nodes=None, **options):
+        game = Game(self.board)
+        start = time.time()
+        solver = IDAStar_Solver(game, max_nodes=max_nodes, **options)
+        solution = self._solve(solver, "idastar", options)
+        elapsed = time.time() - start
 
+        if solution:
+            solver.print_solution_path()
+            solver.print_solution()
+        
+        return solver, elapsed
+
+    def run_portfolio(self, optimal=False, max_nodes=None, **options):
+        """Race DFS, A*, UCS and hill climbing in parallel and keep the first solution"""
+        portfolio = PortfolioSolver(Puzzle.from_board(self.board), optimal=optimal, max_nodes=max_nodes, **options)
+        winner = portfolio.solve()
+        
+        print(f"\nPortfolio finished in {portfolio.elapsed:.3f}s")
+        for name in portfolio.solvers:
+            result = portfolio.results.get(name)
+            status = result.status if result else "cancelled"
+            print(f"  {name:6} {status}")
+        
+        if winner:
+            print(f"\nWinner: {winner.solver} ({winner.nodes:,} states, cost: {winner.cost:.2f})")
+            game = Game(self.board)
+            for color, cell, cost in winner.moves:
+                game.ApplyMove(color, cell, cost)
+            game.printGrid()
+            for color, path in winner.paths.items():
+                print(f"  Color {color}: {path}")
+        else:
+            print("No solution found")
+        
+        return portfolio
+    
     def compare_bfs_astar(self):
         """Compare BFS and A* algorithms (as requested in the task)"""
         if not self.bfs_solver or not self.astar_solver:
@@ -133,8 +215,14 @@ class NumberlinkController:
         print(f"\n{'Metric':<30} {'BFS':>15} {'A*':>15}")
         print("-"*70)
         
+        # A run answered from the solution cache did not search, so it has no statistics
+        cached = self.bfs_solver.adopted or self.astar_solver.adopted
+        
+        def format_states(solver):
+            return "cached" if solver.adopted else f"{solver.visited_count:,}"
+        
         # States explored
-        print(f"{'States Explored':<30} {self.bfs_solver.visited_count:>15,} {self.astar_solver.visited_count:>15,}")
+        print(f"{'States Explored':<30} {format_states(self.bfs_solver):>15} {format_states(self.astar_solver):>15}")
         
         # Time
         def format_time(t):
@@ -143,7 +231,11 @@ class NumberlinkController:
             else:
                 return f"{t:.3f}s"
         
-        print(f"{'Time':<30} {format_time(self.bfs_time):>15} {format_time(self.astar_time):>15}")
+        def format_run_time(solver, t):
+            return "cached" if solver.adopted else format_time(t)
+        
+        print(f"{'Time':<30} {format_run_time(self.bfs_solver, self.bfs_time):>15} "
+              f"{format_run_time(self.astar_solver, self.astar_time):>15}")
         
         # Solution found
         bfs_found = self.bfs_solver.solution_found is not None
@@ -159,7 +251,9 @@ class NumberlinkController:
         
         # Analysis
         print("\nAnalysis:")
-        if astar_found and bfs_found:
+        if cached:
+            print("- A cached run has no search statistics; rerun without the solution cache to compare them")
+        elif astar_found and bfs_found:
             diff = self.bfs_solver.visited_count - self.astar_solver.visited_count
             percent = (diff / self.bfs_solver.visited_count) * 100 if self.bfs_solver.visited_count > 0 else 0
             if diff > 0:
@@ -187,6 +281,8 @@ class NumberlinkController:
             print("5 - A* Solver")
             print("6 - Compare BFS vs A*")
             print("7 - Exit")
+            print("8 - Portfolio (all solvers in parallel)")
+            print("9 - IDA* Solver (memory-bounded)")
 
             choice = input("\nChoice: ").strip()
 
@@ -216,8 +312,16 @@ class NumberlinkController:
             elif choice == "7":
                 print("\nGoodbye!")
                 break
+                
+            elif choice == "8":
+                print("\nRunning solver portfolio...")
+                self.run_portfolio()
+                
+            elif choice == "9":
+                print("\nRunning IDA* Solver...")
+                self.ida_solver, self.ida_time = self.run_ida_star()
             
-            if choice in ["1", "2", "3", "4", "5"]:
+            if choice in ["1", "2", "3", "4", "5", "8", "9"]:
                 if input("\nContinue with same board? (y/n): ").lower() != 'y':
                     if input("New board? (y/n): ").lower() == 'y':
                         if not self.setup_board():
@@ -228,5 +332,6 @@ class NumberlinkController:
                         self.ucs_solver = None
                         self.hill_solver = None
                         self.astar_solver = None
+                        self.ida_solver = None
                     else:
                         break
\ No newline at end of file
@@ -0,0 +1,205 @@
+import heapq
+from array import array
+from collections import deque
+
+OPEN_LISTS = ("auto", "bucket", "heap")
+
+# Largest cell weight for which "auto" picks the bucket queue (one bucket per integer priority)
+MAX_BUCKET_WEIGHT = 64
+
+class OpenList:
+    """
+    Priority queue of (state, node) entries for the best-first solvers,
+    ordered by priority (g for UCS, f = g + h for A*), then by lower h, then
+    by insertion order. A cheaper copy of a state is pushed without removing
+    the old entry; the solver skips the stale entry when it comes out and
+    counts it with discard().
+    """
+
+    def __init__(self):
+        self.pushes = 0
+        self.pops = 0
+        self.stale = 0
+
+    def discard(self):
+        """Record that the entry just popped was stale (lazy deletion)"""
+        self.stale += 1
+
+    def stats(self) -> dict:
+        return {"kind": self.kind, "pushes": self.pushes, "pops": self.pops, "stale": self.stale}
+
+    def checkpoint(self) -> tuple:
+        """(meta, sections) holding every entry, states as PackState records, for a solver checkpoint"""
+        entries = self.entries()
+        states = array('B')
+        for entry in entries:
+            states.frombytes(entry[3].PackState())
+        sections = {
+            "open.priority": array('d', (entry[0] for entry in entries)),
+            "open.h": array('d', (entry[1] for entry in entries)),
+            "open.sequence": array('q', (entry[2] for entry in entries)),
+            "open.nodes": array('q', (entry[4] for entry in entries)),
+            "open.states": states,
+        }
+        return self.stats(), sections
+
+    def restore(self, meta: dict, reader, unpack_states):
+        """Refill this (empty) list from checkpoint(); unpack_states turns the records back into states"""
+        states = unpack_states(reader.section("open.states"))
+        self.load(list(zip(reader.section("open.priority"), reader.section("open.h"),
+                           reader.section("open.sequence"), states, reader.section("open.nodes"))))
+        self.pushes = meta["pushes"]
+        self.pops = meta["pops"]
+        self.stale = meta["stale"]
+
+class HeapOpenList(OpenList):
+    """Binary heap of (priority, h, counter, state, node) tuples; works for any priorities"""
+
+    kind = "heap"
+
+    def __init__(self):
+        super().__init__()
+        self._heap = []
+        self._counter = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, priority, h, state, node: int):
+        heapq.heappush(self._heap, (priority, h, self._counter, state, node))
+        self._counter += 1
+        self.pushes += 1
+
+    def pop(self) -> tuple:
+        """(priority, state, node) of the best entry, removed from the list"""
+        priority, _, _, state, node = heapq.heappop(self._heap)
+        self.pops += 1
+        return priority, state, node
+
+    def peek(self) -> tuple:
+        priority, _, _, state, node = self._heap[0]
+        return priority, state, node
+
+    def entries(self) -> list:
+        """(priority, h, sequence, state, node) of every entry, in heap order"""
+        return list(self._heap)
+
+    def load(self, entries: list):
+        # Entries in heap order already form a valid heap
+        self._heap = list(entries)
+        self._counter = max((entry[2] for entry in entries), default=-1) + 1
+
+class BucketOpenList(OpenList):
+    """
+    Dial's bucket queue for integer priorities: one bucket per priority,
+    each holding a FIFO per h value. Pushes are O(1) and pops scan upwards
+    from the lowest non-empty bucket, which only moves back when a priority
+    below it is pushed (never, for UCS and a consistent heuristic). Integral
+    floats are accepted; fractional priorities would be truncated, so pick
+    this list only for integer cell weights.
+    """
+
+    kind = "bucket"
+
+    def __init__(self):
+        super().__init__()
+        # priority -> {h: deque of state, node, state, node, ...}
+        self._buckets = []
+        self._counts = []
+        self._min_h = []
+        self._low = 0
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def push(self, priority, h, state, node: int):
+        priority = int(priority)
+        h = int(h)
+        buckets = self._buckets
+        if priority >= len(buckets):
+            grow = priority + 1 - len(buckets)
+            buckets.extend([None] * grow)
+            self._counts.extend([0] * grow)
+            self._min_h.extend([0] * grow)
+
+        bucket = buckets[priority]
+        if bucket is None:
+            bucket = buckets[priority] = {}
+        if not bucket or h < self._min_h[priority]:
+            self._min_h[priority] = h
+        entries = bucket.get(h)
+        if entries is None:
+            entries = bucket[h] = deque()
+        entries.append(state)
+        entries.append(node)
+
+        self._counts[priority] += 1
+        if priority < self._low:
+            self._low = priority
+        self._size += 1
+        self.pushes += 1
+
+    def _lowest(self) -> int:
+        counts = self._counts
+        priority = self._low
+        while not counts[priority]:
+            priority += 1
+        self._low = priority
+        return priority
+
+    def pop(self) -> tuple:
+        """(priority, state, node) of the best entry, removed from the list"""
+        priority = self._lowest()
+        bucket = self._buckets[priority]
+        h = self._min_h[priority]
+        entries = bucket[h]
+        state = entries.popleft()
+        node = entries.popleft()
+        if not entries:
+            del bucket[h]
+            if bucket:
+                self._min_h[priority] = min(bucket)
+
+        self._counts[priority] -= 1
+        self._size -= 1
+        self.pops += 1
+        return priority, state, node
+
+    def peek(self) -> tuple:
+        priority = self._lowest()
+        entries = self._buckets[priority][self._min_h[priority]]
+        return priority, entries[0], entries[1]
+
+    def entries(self) -> list:
+        """(priority, h, sequence, state, node) of every entry, FIFO order within each (priority, h)"""
+        result = []
+        for priority, bucket in enumerate(self._buckets):
+            if not bucket:
+                continue
+            for h, queue in bucket.items():
+                pairs = iter(queue)
+                for state in pairs:
+                    result.append((priority, h, 0, state, next(pairs)))
+        return result
+
+    def load(self, entries: list):
+        for priority, h, _, state, node in entries:
+            self.push(priority, h, state, node)
+
+def make_open_list(kind: str, weights) -> OpenList:
+    """
+    Open list for a puzzle with these cell weights. "auto" takes the bucket
+    queue when every weight is a small non-negative integer (so every g and
+    distance-map h is an integer) and the heap otherwise.
+    """
+    if kind not in OPEN_LISTS:
+        raise ValueError(f"Unknown open list {kind!r}, expected one of {OPEN_LISTS}")
+    integral = all(weight >= 0 and float(weight).is_integer() for weight in weights)
+    if kind == "auto":
+        kind = "bucket" if integral and max(weights, default=0) <= MAX_BUCKET_WEIGHT else "heap"
+    if kind == "bucket":
+        if not integral:
+            raise ValueError("The bucket open list needs non-negative integer cell weights")
+        return BucketOpenList()
+    return HeapOpenList()
@@ -0,0 +1,151 @@
+import functools
+import heapq
+import json
+import time
+
+# Game methods timed as phases (whichever of them the state class defines)
+GAME_PHASES = ("GetPossibleMoves", "GetSuccessors", "GetLegalMoves", "GetColorMoves", "PropagateForcedMoves",
+               "CopyState", "ApplyMove", "UndoMove", "IsDeadEnd", "IsDeadEndAfterMove", "IsFinalState",
+               "IsVisitedState", "MarkAsVisited")
+
+# Solver methods timed as phases
+SOLVER_PHASES = ("_root", "_expand", "_hash_state", "_add_node", "_calculate_heuristic", "_evaluate",
+                 "_sort_moves", "_sort_move_tuples", "_reconstruct_path", "_finish_in_place")
+
+HEAP_PHASES = ("heappush", "heappop")
+
+# Open list methods timed as phases (UCS and A*)
+OPEN_LIST_PHASES = ("push", "pop")
+
+class PhaseProfiler:
+    """
+    Opt-in per-phase profiler for the solvers. While a profiled solve() runs,
+    the phases above are replaced by timing wrappers that record calls,
+    inclusive and self time for every call stack; everything is put back
+    afterwards, so an unprofiled search pays nothing. One profiler can be
+    shared by several solvers to aggregate a whole batch.
+    """
+
+    def __init__(self):
+        # (phase, phase, ...) call stack -> [calls, total ns, self ns]
+        self.stacks = {}
+        self._stack = []
+        self._child_time = []
+        self._patches = []
+
+    def reset(self):
+        self.stacks.clear()
+
+    def wrap(self, name: str, func):
+        """Timing wrapper around `func` that records under the current call stack"""
+        stack = self._stack
+        child_time = self._child_time
+        stacks = self.stacks
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stack.append(name)
+            child_time.append(0)
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                children = child_time.pop()
+                path = tuple(stack)
+                stack.pop()
+                if child_time:
+                    child_time[-1] += elapsed
+                entry = stacks.get(path)
+                if entry is None:
+                    entry = stacks[path] = [0, 0, 0]
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] += elapsed - children
+
+        return wrapper
+
+    def _patch(self, owner, attr: str, label: str):
+        had_own = attr in vars(owner)
+        original = getattr(owner, attr)
+        self._patches.append((owner, attr, had_own, vars(owner).get(attr)))
+        setattr(owner, attr, self.wrap(label, original))
+
+    def install(self, solver):
+        """Wrap the phases of `solver`, its state class, its open list and heapq (undone by uninstall)"""
+        state_class = type(solver.initial_game)
+        for attr in GAME_PHASES:
+            if hasattr(state_class, attr):
+                self._patch(state_class, attr, attr)
+        for attr in SOLVER_PHASES:
+            if hasattr(solver, attr):
+                self._patch(solver, attr, attr)
+        open_list = getattr(solver, "open_list", None)
+        if open_list is not None:
+            for attr in OPEN_LIST_PHASES:
+                self._patch(type(open_list), attr, f"{type(open_list).__name__}.{attr}")
+        for attr in HEAP_PHASES:
+            self._patch(heapq, attr, f"heapq.{attr}")
+
+    def uninstall(self):
+        while self._patches:
+            owner, attr, had_own, original = self._patches.pop()
+            if had_own:
+                setattr(owner, attr, original)
+            else:
+                delattr(owner, attr)
+
+    def profiled(self, label: str, func):
+        """`func` run with the phases installed, as the root frame `label`"""
+        solver = func.__self__
+        timed = self.wrap(label, func)
+
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            self.install(solver)
+            try:
+                return timed(*args, **kwargs)
+            finally:
+                self.uninstall()
+
+        return run
+
+    def phases(self) -> dict:
+        """Per-phase totals over all call stacks: calls, inclusive and self seconds"""
+        phases = {}
+        for path, (calls, total, own) in self.stacks.items():
+            entry = phases.setdefault(path[-1], [0, 0, 0])
+            entry[0] += calls
+            entry[2] += own
+            # Count inclusive time once per outermost occurrence of a phase
+            if path[-1] not in path[:-1]:
+                entry[1] += total
+        return {name: {"calls": calls, "total_s": total / 1e9, "self_s": own / 1e9}
+                for name, (calls, total, own) in sorted(phases.items(), key=lambda item: -item[1][2])}
+
+    def as_dict(self) -> dict:
+        return {
+            "phases": self.phases(),
+            "stacks": [{"stack": ";".join(path), "calls": calls, "total_s": total / 1e9, "self_s": own / 1e9}
+                       for path, (calls, total, own) in sorted(self.stacks.items())],
+        }
+
+    def write_json(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
+
+    def write_collapsed(self, path: str):
+        """Collapsed-stack file (self time in microseconds) for flamegraph.pl / speedscope"""
+        with open(path, "w") as f:
+            for stack, (_, _, own) in sorted(self.stacks.items()):
+                if own >= 1000:
+                    f.write(f"{';'.join(stack)} {own // 1000}\n")
+
+    def print_report(self):
+        print(f"\n{'phase':24} {'calls':>10} {'total':>10} {'self':>10} {'self %':>7}")
+        phases = self.phases()
+        total_self = sum(phase["self_s"] for phase in phases.values()) or 1.0
+        for name, phase in phases.items():
+            print(f"{name:24} {phase['calls']:>10,} {phase['total_s']:>9.3f}s {phase['self_s']:>9.3f}s "
+                  f"{phase['self_s'] / total_self:>6.1%}")
@@ -0,0 +1,115 @@
+import multiprocessing
+import queue
+import time
+from typing import Optional
+from BatchSolver import SOLVERS, BatchResult, proves_optimality, solve_puzzle
+from PuzzleFile import Puzzle
+
+DEFAULT_PORTFOLIO = ("dfs", "astar", "ucs", "hill")
+
+# Solvers that search exhaustively, so giving up without a budget stop proves there is no solution
+COMPLETE_SOLVERS = ("dfs", "bfs", "extbfs", "ucs", "astar", "idastar")
+
+def _portfolio_worker(results, puzzle, solver_name, max_nodes, time_limit, options):
+    results.put(solve_puzzle(puzzle, solver_name, max_nodes, time_limit, **options))
+
+class PortfolioSolver:
+    """
+    Races several solvers on one puzzle, each in its own process, and keeps
+    the first valid solution; the losers are terminated at once. With
+    optimal=True only solvers that prove optimality take part, so the first
+    solution is also the cheapest.
+    """
+
+    def __init__(self, puzzle: Puzzle, solvers=DEFAULT_PORTFOLIO, optimal=False, max_nodes=None,
+                 time_limit=None, **options):
+        for name in solvers:
+            if name not in SOLVERS:
+                raise ValueError(f"Unknown solver {name!r}, expected one of {sorted(SOLVERS)}")
+        self.puzzle = puzzle
+        self.optimal = optimal
+        self.max_nodes = max_nodes
+        self.time_limit = time_limit
+        self.options = options
+        self.solvers = self._select_solvers(solvers) if optimal else tuple(solvers)
+        if not self.solvers:
+            raise ValueError("No solver in the portfolio can prove optimality for this puzzle")
+        self.winner = None
+        self.results = {}
+        self.elapsed = 0.0
+
+    def _select_solvers(self, solvers) -> tuple:
+        """Portfolio members that can prove optimality for this puzzle"""
+        return tuple(name for name in solvers if proves_optimality(name, self.puzzle.weights, self.options))
+
+    def _is_decisive(self, result: BatchResult) -> bool:
+        """True if this result settles the puzzle (a solution, or a proof there is none)"""
+        if result.solved:
+            return True
+        return result.status == "unsolved" and result.solver in COMPLETE_SOLVERS
+
+    def solve(self) -> Optional[BatchResult]:
+        """Run the race; returns the winning solved result, or None"""
+        start = time.time()
+        self.winner = None
+        self.results = {}
+
+        context = multiprocessing.get_context()
+        results = context.Queue()
+        processes = {}
+        for name in self.solvers:
+            process = context.Process(target=_portfolio_worker, daemon=True,
+                                      args=(results, self.puzzle, name, self.max_nodes, self.time_limit, self.options))
+            process.start()
+            processes[name] = process
+
+        try:
+            while len(self.results) < len(processes):
+                try:
+                    result = results.get(timeout=0.1)
+                except queue.Empty:
+                    # A worker that died without reporting would otherwise hang the race
+                    for name, process in processes.items():
+                        if name not in self.results and not process.is_alive() and process.exitcode != 0:
+                            self.results[name] = BatchResult(0, self.puzzle, name, "error",
+                                                             error=f"exit code {process.exitcode}")
+                    continue
+
+                self.results[result.solver] = result
+                if self._is_decisive(result):
+                    if result.solved:
+                        self.winner = result
+                    break
+        finally:
+            for process in processes.values():
+                if process.is_alive():
+                    process.terminate()
+            for process in processes.values():
+                process.join()
+            results.close()
+
+        self.elapsed = time.time() - start
+        return self.winner
+
+    def outcome(self) -> BatchResult:
+        """Result to report for the race: the winner, a proof of no solution, or the best stop reason"""
+        if self.winner is not None:
+            return self.winner
+        for result in self.results.values():
+            if self._is_decisive(result):
+                return result
+        statuses = [result.status for result in self.results.values()]
+        status = next((reason for reason in ("time", "nodes", "unsolved", "error") if reason in statuses), "unsolved")
+        nodes = sum(result.nodes for result in self.results.values())
+        return BatchResult(0, self.puzzle, "portfolio", status, nodes=nodes, seconds=self.elapsed)
+
+def solve_portfolio_batch(puzzles, solvers=DEFAULT_PORTFOLIO, optimal=False, max_nodes=None, time_limit=None,
+                          **options):
+    """Race the portfolio on each puzzle in turn, yielding one BatchResult per puzzle"""
+    for index, puzzle in enumerate(puzzles):
+        portfolio = PortfolioSolver(puzzle, solvers, optimal, max_nodes, time_limit, **options)
+        portfolio.solve()
+        result = portfolio.outcome()
+        result.index = index
+        result.seconds = portfolio.elapsed
+        yield result
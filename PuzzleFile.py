@@ -0,0 +1,233 @@
+"""
+Puzzle files, read and written without any prompts.
+
+Text format (JSON Lines, extension .jsonl / .json): one puzzle per line, blank
+lines and lines starting with '#' are skipped.
+
+    {"name": "p5", "rows": 5, "cols": 5,
+     "endpoints": {"1": [[0, 0], [4, 1]], "2": [[0, 2], [3, 1]]},
+     "weights": [1, 1, ...],                      # optional, rows*cols row-major
+     "solution": {"1": [[0, 0], [1, 0], ...]}}    # optional, start..end per color
+
+Binary format (extension .nlb): the header b"NLPZ" plus a version byte,
+then one length-prefixed record per puzzle, all little-endian:
+
+    u32 record length (bytes after this field)
+    u16 rows, u16 cols, u8 colors, u8 flags (1 = weights, 2 = solution)
+    u16 name length, utf-8 name
+    colors x (u8 color, u16 start cell, u16 end cell)     # cell = row * cols + col
+    if weights:  rows*cols x f32
+    if solution: colors x (u16 length, length x u16 cell) # same color order
+
+Both readers are generators, so a corpus is never loaded in full.
+"""
+
+import json
+import struct
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from Board import Board
+from Game import Game
+
+BINARY_MAGIC = b"NLPZ"
+BINARY_VERSION = 1
+
+FLAG_WEIGHTS = 1
+FLAG_SOLUTION = 2
+
+_RECORD_LENGTH = struct.Struct("<I")
+_RECORD_HEADER = struct.Struct("<HHBBH")
+_ENDPOINT = struct.Struct("<BHH")
+_U16 = struct.Struct("<H")
+
+class Puzzle:
+    """One puzzle as stored in a file: size, endpoints, optional weights and known solution"""
+
+    def __init__(self, rows: int, cols: int, endpoints: Dict[int, tuple], weights: Optional[List[float]] = None,
+                 solution: Optional[Dict[int, List[tuple]]] = None, name: str = ""):
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        # color -> ((start_row, start_col), (end_row, end_col))
+        self.endpoints = {int(color): (tuple(start), tuple(end)) for color, (start, end) in endpoints.items()}
+        self.weights = list(weights) if weights is not None else None
+        # color -> [(row, col), ...] from start to end
+        self.solution = ({int(color): [tuple(cell) for cell in path] for color, path in solution.items()}
+                         if solution is not None else None)
+
+    def __repr__(self):
+        return f"Puzzle({self.name!r}, {self.rows}x{self.cols}, colors={len(self.endpoints)})"
+
+    @classmethod
+    def from_board(cls, board: Board, name: str = "", solution=None) -> 'Puzzle':
+        endpoints = {color: (pos["start"], pos["end"]) for color, pos in board.positions.items()}
+        weights = [weight if weight % 1 else int(weight) for weight in board.weights.tolist()]
+        if all(weight == 1 for weight in weights):
+            weights = None
+        return cls(board.rows, board.cols, endpoints, weights, solution, name)
+
+    def to_board(self) -> Board:
+        board = Board(self.cols, self.rows, len(self.endpoints))
+        board.set_positions({color: {"start": start, "end": end} for color, (start, end) in self.endpoints.items()})
+        if self.weights is not None:
+            board.set_weights(self.weights)
+        return board
+
+    def to_game(self) -> Game:
+        return Game(self.to_board())
+
+    def solution_cost(self) -> Optional[float]:
+        """Total weight of the known solution (every entered cell, as Game.ApplyMove charges)"""
+        if self.solution is None:
+            return None
+        weights = self.weights
+        total = 0.0
+        for path in self.solution.values():
+            for row, col in path[1:]:
+                total += weights[row * self.cols + col] if weights is not None else 1.0
+        return total
+
+    def to_dict(self) -> dict:
+        record = {"name": self.name, "rows": self.rows, "cols": self.cols,
+                  "endpoints": {str(color): [list(start), list(end)] for color, (start, end) in self.endpoints.items()}}
+        if self.weights is not None:
+            record["weights"] = self.weights
+        if self.solution is not None:
+            record["solution"] = {str(color): [list(cell) for cell in path] for color, path in self.solution.items()}
+        return record
+
+    @classmethod
+    def from_dict(cls, record: dict) -> 'Puzzle':
+        for key in ("rows", "cols", "endpoints"):
+            if key not in record:
+                raise ValueError(f"Puzzle record is missing '{key}'")
+        return cls(record["rows"], record["cols"], record["endpoints"], record.get("weights"),
+                   record.get("solution"), record.get("name", ""))
+
+def read_text(path: str) -> Iterator[Puzzle]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                puzzle = Puzzle.from_dict(json.loads(line))
+            except (ValueError, TypeError) as e:
+                raise ValueError(f"{path}:{line_number}: {e}") from e
+            if not puzzle.name:
+                puzzle.name = f"line{line_number}"
+            yield puzzle
+
+def write_text(path: str, puzzles: Iterable[Puzzle]) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for puzzle in puzzles:
+            f.write(json.dumps(puzzle.to_dict(), separators=(",", ":")))
+            f.write("\n")
+            count += 1
+    return count
+
+def _encode(puzzle: Puzzle) -> bytes:
+    cols = puzzle.cols
+    name = puzzle.name.encode("utf-8")
+    flags = (FLAG_WEIGHTS if puzzle.weights is not None else 0) | (FLAG_SOLUTION if puzzle.solution is not None else 0)
+    parts = [_RECORD_HEADER.pack(puzzle.rows, cols, len(puzzle.endpoints), flags, len(name)), name]
+
+    for color, (start, end) in puzzle.endpoints.items():
+        parts.append(_ENDPOINT.pack(color, start[0] * cols + start[1], end[0] * cols + end[1]))
+
+    if puzzle.weights is not None:
+        parts.append(struct.pack(f"<{len(puzzle.weights)}f", *puzzle.weights))
+
+    if puzzle.solution is not None:
+        for color in puzzle.endpoints:
+            path = puzzle.solution[color]
+            parts.append(_U16.pack(len(path)))
+            parts.append(struct.pack(f"<{len(path)}H", *(row * cols + col for row, col in path)))
+
+    return b"".join(parts)
+
+def _decode(data: bytes) -> Puzzle:
+    rows, cols, num_colors, flags, name_length = _RECORD_HEADER.unpack_from(data, 0)
+    offset = _RECORD_HEADER.size
+    name = data[offset:offset + name_length].decode("utf-8")
+    offset += name_length
+
+    endpoints = {}
+    order = []
+    for _ in range(num_colors):
+        color, start, end = _ENDPOINT.unpack_from(data, offset)
+        offset += _ENDPOINT.size
+        endpoints[color] = (divmod(start, cols), divmod(end, cols))
+        order.append(color)
+
+    weights = None
+    if flags & FLAG_WEIGHTS:
+        size = rows * cols
+        weights = [weight if weight % 1 else int(weight)
+                   for weight in struct.unpack_from(f"<{size}f", data, offset)]
+        offset += 4 * size
+
+    solution = None
+    if flags & FLAG_SOLUTION:
+        solution = {}
+        for color in order:
+            (length,) = _U16.unpack_from(data, offset)
+            offset += _U16.size
+            cells = struct.unpack_from(f"<{length}H", data, offset)
+            offset += 2 * length
+            solution[color] = [divmod(cell, cols) for cell in cells]
+
+    return Puzzle(rows, cols, endpoints, weights, solution, name)
+
+def read_binary(path: str) -> Iterator[Puzzle]:
+    with open(path, "rb") as f:
+        header = f.read(len(BINARY_MAGIC) + 1)
+        if header[:len(BINARY_MAGIC)] != BINARY_MAGIC:
+            raise ValueError(f"{path}: not a binary puzzle file")
+        if header[len(BINARY_MAGIC)] != BINARY_VERSION:
+            raise ValueError(f"{path}: unsupported binary puzzle version {header[len(BINARY_MAGIC)]}")
+
+        index = 0
+        while True:
+            prefix = f.read(_RECORD_LENGTH.size)
+            if not prefix:
+                break
+            if len(prefix) < _RECORD_LENGTH.size:
+                raise ValueError(f"{path}: truncated record {index}")
+            (length,) = _RECORD_LENGTH.unpack(prefix)
+            data = f.read(length)
+            if len(data) < length:
+                raise ValueError(f"{path}: truncated record {index}")
+            puzzle = _decode(data)
+            if not puzzle.name:
+                puzzle.name = f"record{index}"
+            index += 1
+            yield puzzle
+
+def write_binary(path: str, puzzles: Iterable[Puzzle]) -> int:
+    count = 0
+    with open(path, "wb") as f:
+        f.write(BINARY_MAGIC + bytes([BINARY_VERSION]))
+        for puzzle in puzzles:
+            data = _encode(puzzle)
+            f.write(_RECORD_LENGTH.pack(len(data)))
+            f.write(data)
+            count += 1
+    return count
+
+def read_puzzles(path: str) -> Iterator[Puzzle]:
+    """Stream puzzles from a text or binary file (detected from its first bytes)"""
+    with open(path, "rb") as f:
+        is_binary = f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+    return read_binary(path) if is_binary else read_text(path)
+
+def write_puzzles(path: str, puzzles: Iterable[Puzzle]) -> int:
+    """Write puzzles as binary for a .nlb path, as JSON Lines otherwise; returns the count"""
+    if path.endswith(".nlb"):
+        return write_binary(path, puzzles)
+    return write_text(path, puzzles)
+
+def iter_games(path: str) -> Iterator[Tuple[Puzzle, Game]]:
+    """Stream (puzzle, fresh Game) pairs ready to hand to a solver"""
+    for puzzle in read_puzzles(path):
+        yield puzzle, puzzle.to_game()
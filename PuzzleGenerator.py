@@ -0,0 +1,148 @@
+import argparse
+import random
+from typing import Iterator, List, Optional, Tuple
+from Board import Board
+from PuzzleFile import Puzzle, write_puzzles
+
+def _serpentine_path(rows: int, cols: int) -> List[int]:
+    """Boustrophedon Hamiltonian path over the grid, as flat cell indices"""
+    path = []
+    for row in range(rows):
+        cells = range(row * cols, (row + 1) * cols)
+        path.extend(cells if row % 2 == 0 else reversed(cells))
+    return path
+
+def _neighbors(cell: int, rows: int, cols: int) -> List[int]:
+    row, col = divmod(cell, cols)
+    neighbors = []
+    if row > 0:
+        neighbors.append(cell - cols)
+    if row < rows - 1:
+        neighbors.append(cell + cols)
+    if col > 0:
+        neighbors.append(cell - 1)
+    if col < cols - 1:
+        neighbors.append(cell + 1)
+    return neighbors
+
+def random_hamiltonian_path(rows: int, cols: int, rng: random.Random, moves: Optional[int] = None) -> List[int]:
+    """
+    Random Hamiltonian path by backbite moves: join one end of the path to a
+    grid neighbour further along it and reverse the loop that closes, which
+    leaves a new end. Starting from a serpentine, a few moves per cell mix it well.
+    """
+    path = _serpentine_path(rows, cols)
+    position = [0] * len(path)
+    for i, cell in enumerate(path):
+        position[cell] = i
+    last = len(path) - 1
+
+    for _ in range(moves if moves is not None else 10 * len(path)):
+        if rng.random() < 0.5:
+            neighbor = rng.choice(_neighbors(path[0], rows, cols))
+            i = position[neighbor]
+            if i == 1:
+                continue
+            # path[0..i-1] reversed: path[i-1] becomes the new start
+            path[:i] = path[i - 1::-1]
+            for j in range(i):
+                position[path[j]] = j
+        else:
+            neighbor = rng.choice(_neighbors(path[last], rows, cols))
+            i = position[neighbor]
+            if i == last - 1:
+                continue
+            # path[i+1..last] reversed: path[i+1] becomes the new end
+            path[i + 1:] = path[:i:-1]
+            for j in range(i + 1, len(path)):
+                position[path[j]] = j
+
+    return path
+
+def _segment_lengths(size: int, num_colors: int, min_length: int, rng: random.Random) -> List[int]:
+    """Random composition of `size` into num_colors parts of at least min_length cells"""
+    extra = size - num_colors * min_length
+    cuts = sorted(rng.sample(range(extra + num_colors - 1), num_colors - 1))
+    lengths = []
+    previous = -1
+    for cut in cuts + [extra + num_colors - 1]:
+        lengths.append(min_length + cut - previous - 1)
+        previous = cut
+    return lengths
+
+def generate_puzzle(rows: int, cols: int, num_colors: int, seed=0, weight_range: Optional[Tuple[int, int]] = None,
+                    min_length: int = 3, name: Optional[str] = None) -> Puzzle:
+    """
+    Solvable puzzle from a seed: a random Hamiltonian path is cut into
+    num_colors segments of at least min_length cells, whose ends become the
+    endpoints. The segments fill the board, so they are stored as the known
+    solution. weight_range=(low, high) draws integer cell weights uniformly,
+    None keeps unit weights.
+    """
+    if rows < 2 or cols < 2:
+        raise ValueError("Board must be at least 2x2")
+    if min_length < 2:
+        raise ValueError("min_length must be at least 2")
+    if not 1 <= num_colors <= min(255, rows * cols // min_length):
+        raise ValueError(f"Cannot fit {num_colors} colors of length >= {min_length} on a {rows}x{cols} board")
+
+    # Seeded by value (like the Zobrist keys) so every run and process agrees
+    rng = random.Random(f"numberlink-{seed}-{rows}x{cols}-{num_colors}-{min_length}")
+    path = random_hamiltonian_path(rows, cols, rng)
+
+    endpoints = {}
+    solution = {}
+    offset = 0
+    for color, length in enumerate(_segment_lengths(rows * cols, num_colors, min_length, rng), 1):
+        segment = [divmod(cell, cols) for cell in path[offset:offset + length]]
+        endpoints[color] = (segment[0], segment[-1])
+        solution[color] = segment
+        offset += length
+
+    weights = None
+    if weight_range is not None:
+        low, high = weight_range
+        if low < 0 or high < low:
+            raise ValueError(f"Invalid weight range {weight_range}")
+        weights = [rng.randint(low, high) for _ in range(rows * cols)]
+
+    if name is None:
+        name = f"gen-{rows}x{cols}-c{num_colors}-s{seed}"
+    return Puzzle(rows, cols, endpoints, weights, solution, name)
+
+def generate_board(rows: int, cols: int, num_colors: int, seed=0, weight_range=None, min_length: int = 3) -> Board:
+    return generate_puzzle(rows, cols, num_colors, seed, weight_range, min_length).to_board()
+
+def default_colors(rows: int, cols: int, min_length: int = 3) -> int:
+    """Color count the interactive setup allows (at most max(rows, cols)), capped to what fits"""
+    return min(max(rows, cols), rows * cols // min_length)
+
+def generate_suite(sizes, count: int, seed=0, num_colors=None, weight_range=None,
+                   min_length: int = 3) -> Iterator[Puzzle]:
+    """`count` puzzles per size, e.g. sizes=[5, 10, 20, 30] for square boards or (rows, cols) pairs"""
+    for size in sizes:
+        rows, cols = (size, size) if isinstance(size, int) else size
+        colors = num_colors or default_colors(rows, cols, min_length)
+        for index in range(count):
+            yield generate_puzzle(rows, cols, colors, f"{seed}-{index}", weight_range, min_length,
+                                  name=f"gen-{rows}x{cols}-c{colors}-s{seed}-{index}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate seeded, guaranteed-solvable puzzle files")
+    parser.add_argument("output", help="puzzle file to write (.nlb for binary, JSON Lines otherwise)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 10, 15, 20, 25, 30], help="square board sides")
+    parser.add_argument("--count", type=int, default=10, help="puzzles per size")
+    parser.add_argument("--colors", type=int, default=None, help="colors per puzzle (default: board side)")
+    parser.add_argument("--min-length", type=int, default=3, help="minimum cells per color path")
+    parser.add_argument("--weights", type=int, nargs=2, metavar=("LOW", "HIGH"), default=None,
+                        help="random integer cell weights in [LOW, HIGH] (default: all 1)")
+    parser.add_argument("--seed", default="0")
+    args = parser.parse_args(argv)
+
+    count = write_puzzles(args.output, generate_suite(args.sizes, args.count, args.seed, args.colors,
+                                                      tuple(args.weights) if args.weights else None,
+                                                      args.min_length))
+    print(f"Wrote {count} puzzles to {args.output}")
+
+if __name__ == "__main__":
+    main()
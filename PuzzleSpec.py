@@ -0,0 +1,49 @@
+from Board import Board
+
+class PuzzleSpec:
+    """
+    Read-only description of a puzzle, shared by every Game state of a search.
+    Holds everything that never changes while solving: dimensions, endpoints,
+    cell weights, adjacency and Zobrist tables. Cells are flat indices
+    (row * cols + col); coords maps them back to (row, col) for display.
+    """
+
+    __slots__ = ('rows', 'cols', 'size', 'colors', 'starts', 'ends', 'coords',
+                 'weights', 'neighbors', 'rings', 'initial_grid', 'zobrist', 'manhattan')
+
+    def __init__(self, board: Board):
+        self.rows = board.rows
+        self.cols = board.cols
+        self.size = board.rows * board.cols
+        self.colors = tuple(board.positions)
+        self.starts = {color: self.idx(*pos["start"]) for color, pos in board.positions.items()}
+        self.ends = {color: self.idx(*pos["end"]) for color, pos in board.positions.items()}
+        self.coords = tuple(divmod(cell, self.cols) for cell in range(self.size))
+        self.weights = tuple(board.weights.tolist())
+        self.initial_grid = bytes(board.grid.tobytes())
+        self.zobrist = {color: board.get_zobrist_keys(color) for color in self.colors}
+
+        # Per-cell slices of the board's CSR table, cut once so move generation
+        # can iterate them directly
+        start, cells = board.neighbor_start, board.neighbor_cells
+        self.neighbors = tuple(tuple(cells[start[i]:start[i + 1]]) for i in range(self.size))
+
+        # 8-cell ring around each cell, clockwise from UP, -1 outside the board
+        ring_offsets = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+        rings = []
+        for row, col in self.coords:
+            ring = []
+            for dr, dc in ring_offsets:
+                nr, nc = row + dr, col + dc
+                ring.append(self.idx(nr, nc) if 0 <= nr < self.rows and 0 <= nc < self.cols else -1)
+            rings.append(tuple(ring))
+        self.rings = tuple(rings)
+
+        # Manhattan distance from every cell to each color's end, for running heuristic deltas
+        self.manhattan = {}
+        for color, end in self.ends.items():
+            end_row, end_col = self.coords[end]
+            self.manhattan[color] = tuple(abs(row - end_row) + abs(col - end_col) for row, col in self.coords)
+
+    def idx(self, row, col):
+        return row * self.cols + col
@@ -0,0 +1,34 @@
+from typing import Optional
+
+class SearchProgress:
+    """
+    Snapshot handed to a solver's observer every `observe_every` expansions
+    (and once more with final=True when the search ends). Fields a solver
+    does not track are None: best_f/best_g exist only for best-first
+    searches, and depth is the deepest level reached (DFS, BFS, hill
+    climbing) or the depth of the best frontier node (UCS, A*).
+    """
+
+    __slots__ = ('solver', 'nodes', 'elapsed', 'nodes_per_sec', 'frontier', 'best_f', 'best_g',
+                 'depth', 'memory', 'final')
+
+    def __init__(self, solver: str, nodes: int, elapsed: float, frontier: int, best_f: Optional[float],
+                 best_g: Optional[float], depth: Optional[int], memory: Optional[int], final: bool = False):
+        self.solver = solver
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.nodes_per_sec = nodes / elapsed if elapsed > 0 else 0.0
+        self.frontier = frontier
+        self.best_f = best_f
+        self.best_g = best_g
+        self.depth = depth
+        # Resident memory in bytes, None where the platform cannot report it
+        self.memory = memory
+        self.final = final
+
+    def __repr__(self):
+        return (f"SearchProgress({self.solver}, nodes={self.nodes}, {self.nodes_per_sec:.0f}/s, "
+                f"frontier={self.frontier}, f={self.best_f}, g={self.best_g}, depth={self.depth})")
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional
+from PuzzleFile import Puzzle
+
+DEFAULT_MAX_ENTRIES = 10000
+
+# The eight symmetries of a board, mapping (row, col) of a rows x cols board; the
+# odd rotations and the two transposes turn it into a cols x rows board
+_TRANSFORMS = (
+    lambda row, col, rows, cols: (row, col),
+    lambda row, col, rows, cols: (col, rows - 1 - row),
+    lambda row, col, rows, cols: (rows - 1 - row, cols - 1 - col),
+    lambda row, col, rows, cols: (cols - 1 - col, row),
+    lambda row, col, rows, cols: (row, cols - 1 - col),
+    lambda row, col, rows, cols: (rows - 1 - row, col),
+    lambda row, col, rows, cols: (col, row),
+    lambda row, col, rows, cols: (cols - 1 - col, rows - 1 - row),
+)
+_SWAPS_DIMENSIONS = (False, True, False, True, False, False, True, True)
+_INVERSE = (0, 3, 2, 1, 4, 5, 6, 7)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    fingerprint TEXT PRIMARY KEY,
+    moves TEXT NOT NULL,
+    solver TEXT NOT NULL,
+    cost REAL NOT NULL,
+    optimal INTEGER NOT NULL,
+    last_used INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS solutions_last_used ON solutions (last_used);
+"""
+
+def default_cache_path() -> Optional[str]:
+    """$NUMBERLINK_CACHE if set (empty turns the cache off), else ~/.cache/numberlink/solutions.sqlite"""
+    path = os.environ.get("NUMBERLINK_CACHE")
+    if path is not None:
+        return path or None
+    return os.path.join(os.path.expanduser("~"), ".cache", "numberlink", "solutions.sqlite")
+
+class CanonicalForm:
+    """
+    A puzzle reduced to one representative of its symmetry and recoloring
+    class. `transform` maps the puzzle's cells onto the canonical board and
+    `labels` maps its colors to the canonical ones (1, 2, ... in order of
+    their start cells), so a solution can be moved between the two.
+    """
+
+    __slots__ = ('fingerprint', 'transform', 'labels', 'rows', 'cols')
+
+    def __init__(self, puzzle: Puzzle):
+        rows, cols = puzzle.rows, puzzle.cols
+        weights = puzzle.weights
+        if weights is not None and all(weight == 1 for weight in weights):
+            weights = None
+
+        # Endpoints decide first; the weights only break ties between symmetries
+        candidates = []
+        for transform, mapping in enumerate(_TRANSFORMS):
+            mapped_cols = rows if _SWAPS_DIMENSIONS[transform] else cols
+            pairs = []
+            for color, (start, end) in puzzle.endpoints.items():
+                start_row, start_col = mapping(start[0], start[1], rows, cols)
+                end_row, end_col = mapping(end[0], end[1], rows, cols)
+                pairs.append((start_row * mapped_cols + start_col, end_row * mapped_cols + end_col, color))
+            pairs.sort()
+            key = (cols if _SWAPS_DIMENSIONS[transform] else rows, mapped_cols,
+                   tuple(cell for start, end, _ in pairs for cell in (start, end)))
+            candidates.append((key, transform, pairs))
+
+        best_key = min(candidate[0] for candidate in candidates)
+        tied = [candidate for candidate in candidates if candidate[0] == best_key]
+        best_weights = None
+        key, transform, pairs = tied[0]
+        if weights is not None:
+            for candidate in tied:
+                mapped = self._map_weights(weights, candidate[1], rows, cols)
+                if best_weights is None or mapped < best_weights:
+                    best_weights = mapped
+                    key, transform, pairs = candidate
+
+        self.transform = transform
+        self.labels = {color: label for label, (_, _, color) in enumerate(pairs, 1)}
+        self.rows, self.cols = key[0], key[1]
+        encoded = json.dumps([key[0], key[1], key[2], best_weights], separators=(",", ":"))
+        self.fingerprint = hashlib.sha256(encoded.encode()).hexdigest()
+
+    @staticmethod
+    def _map_weights(weights: List[float], transform: int, rows: int, cols: int) -> tuple:
+        mapping = _TRANSFORMS[transform]
+        mapped_cols = rows if _SWAPS_DIMENSIONS[transform] else cols
+        mapped = [0.0] * (rows * cols)
+        for cell, weight in enumerate(weights):
+            row, col = mapping(cell // cols, cell % cols, rows, cols)
+            mapped[row * mapped_cols + col] = float(weight)
+        return tuple(mapped)
+
+    def to_canonical(self, moves: list, source_cols: int) -> list:
+        """(color, cell, cost) moves of the puzzle as [label, canonical cell] pairs"""
+        mapping = _TRANSFORMS[self.transform]
+        rows, cols = (self.cols, self.rows) if _SWAPS_DIMENSIONS[self.transform] else (self.rows, self.cols)
+        result = []
+        for color, cell, _ in moves:
+            row, col = mapping(cell // source_cols, cell % source_cols, rows, cols)
+            result.append([self.labels[color], row * self.cols + col])
+        return result
+
+    def from_canonical(self, pairs: list, puzzle: Puzzle) -> list:
+        """[label, canonical cell] pairs back as (color, cell, cost) moves of `puzzle`"""
+        inverse = _TRANSFORMS[_INVERSE[self.transform]]
+        colors = {label: color for color, label in self.labels.items()}
+        weights = puzzle.weights
+        moves = []
+        for label, cell in pairs:
+            row, col = inverse(cell // self.cols, cell % self.cols, self.rows, self.cols)
+            cell = row * puzzle.cols + col
+            moves.append((colors[label], cell, weights[cell] if weights is not None else 1))
+        return moves
+
+class CachedSolution:
+    """A cache hit, already mapped onto the puzzle that was looked up"""
+
+    __slots__ = ('solver', 'cost', 'optimal', 'moves', 'paths')
+
+    def __init__(self, solver: str, cost: float, optimal: bool, moves: list, paths: Dict[int, List[tuple]]):
+        self.solver = solver
+        self.cost = cost
+        self.optimal = optimal
+        # (color, cell, cost) in the order they were played, and color -> [(row, col), ...]
+        self.moves = moves
+        self.paths = paths
+
+class SolutionCache:
+    """
+    Solutions on disk (SQLite), keyed by the canonical fingerprint of the
+    dimensions, endpoints and weights, so a rotated, mirrored or recolored
+    copy of a solved puzzle is a hit. Each entry keeps the solver that found
+    it, its cost and whether that solver proves optimality; a cheaper or
+    newly proven solution replaces it. Beyond max_entries the least recently
+    used entries are evicted. Several processes may share one file.
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def __enter__(self) -> 'SolutionCache':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, puzzle: Puzzle, require_optimal: bool = False) -> Optional[CachedSolution]:
+        """The cached solution of `puzzle` in its own cells and colors, or None"""
+        form = CanonicalForm(puzzle)
+        row = self._db.execute("SELECT moves, solver, cost, optimal FROM solutions WHERE fingerprint = ?",
+                               (form.fingerprint,)).fetchone()
+        if row is None or (require_optimal and not row[3]):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._db.execute("UPDATE solutions SET last_used = ? WHERE fingerprint = ?", (time.time_ns(), form.fingerprint))
+
+        moves = form.from_canonical(json.loads(row[0]), puzzle)
+        paths = {color: [start] for color, (start, _) in puzzle.endpoints.items()}
+        for color, cell, _ in moves:
+            paths[color].append(divmod(cell, puzzle.cols))
+        return CachedSolution(row[1], row[2], bool(row[3]), moves, paths)
+
+    def put(self, puzzle: Puzzle, moves: list, solver: str, cost: float, optimal: bool) -> bool:
+        """
+        Record a solution given as (color, cell, cost) moves; returns False
+        if the entry already held one at least as good (proven optimal, or
+        not proven and no more expensive).
+        """
+        form = CanonicalForm(puzzle)
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT cost, optimal FROM solutions WHERE fingerprint = ?",
+                             (form.fingerprint,)).fetchone()
+            if row is not None and (row[1] or (not optimal and row[0] <= cost)):
+                db.execute("UPDATE solutions SET last_used = ? WHERE fingerprint = ?",
+                           (time.time_ns(), form.fingerprint))
+                db.execute("COMMIT")
+                return False
+
+            encoded = json.dumps(form.to_canonical(moves, puzzle.cols), separators=(",", ":"))
+            db.execute("INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?)",
+                       (form.fingerprint, encoded, solver, float(cost), int(bool(optimal)), time.time_ns()))
+            if row is None:
+                self._evict()
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return True
+
+    def _evict(self):
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self._db.execute("DELETE FROM solutions WHERE fingerprint IN "
+                             "(SELECT fingerprint FROM solutions ORDER BY last_used LIMIT ?)", (excess,))
+
+    def clear(self):
+        self._db.execute("DELETE FROM solutions")
+
+    def close(self):
+        self._db.close()
+
+# Caches opened by open_cache in this process, by path
+_open_caches = {}
+
+def open_cache(path: str, max_entries: int = DEFAULT_MAX_ENTRIES) -> SolutionCache:
+    """
+    The SolutionCache for `path`, opened once per process and reused, so
+    batch workers keep their connection between puzzles. A connection is
+    never shared with a forked child.
+    """
+    key = (path, os.getpid())
+    cache = _open_caches.get(key)
+    if cache is None:
+        cache = _open_caches[key] = SolutionCache(path, max_entries)
+    cache.max_entries = max_entries
+    return cache
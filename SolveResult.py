@@ -0,0 +1,33 @@
+from typing import Optional
+from Game import Game
+
+# Stop reasons that mean a limit was hit rather than the search finishing
+BUDGET_REASONS = ("nodes", "time", "memory", "cancelled")
+
+class SolveResult:
+    """
+    Structured outcome of BaseSolver.run(). status is "solved", "unsolved"
+    (search finished without a solution) or the limit that stopped it:
+    "nodes", "time", "memory" or "cancelled". best_state is the solution, or
+    the partial state with the most completed colors reached before stopping.
+    """
+
+    __slots__ = ('status', 'solution', 'best_state', 'nodes', 'seconds')
+
+    def __init__(self, status: str, solution: Optional[Game], best_state: Optional[Game], nodes: int, seconds: float):
+        self.status = status
+        self.solution = solution
+        self.best_state = best_state
+        self.nodes = nodes
+        self.seconds = seconds
+
+    def __repr__(self):
+        return f"SolveResult({self.status!r}, nodes={self.nodes}, seconds={self.seconds:.3f})"
+
+    @property
+    def solved(self) -> bool:
+        return self.status == "solved"
+
+    @property
+    def budget_exceeded(self) -> bool:
+        return self.status in BUDGET_REASONS
@@ -0,0 +1,185 @@
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from BaseSolver import peak_rss
+from BatchSolver import SOLVERS
+from PuzzleFile import Puzzle, read_puzzles
+from PuzzleGenerator import generate_suite
+
+BASELINE_VERSION = 1
+
+# Metrics compared against the baseline and whether a higher value is worse.
+# Deterministic ones repeat exactly on unchanged code and always gate;
+# measured ones vary with machine load and are only compared on request.
+DETERMINISTIC_METRICS = {
+    "nodes": True,
+    "peak_frontier": True,
+}
+MEASURED_METRICS = {
+    "seconds": True,
+    "nodes_per_sec": False,
+    "peak_rss_kb": True,
+}
+
+# Timings of cases faster than this (in either run) are scheduler noise
+MIN_SECONDS = 0.5
+
+def default_corpus() -> list:
+    """Fixed generated corpus: unit and weighted boards from 5x5 to 7x7, same on every machine"""
+    puzzles = list(generate_suite([5, 6, 7], count=2, seed="benchmark"))
+    puzzles += list(generate_suite([5, 6], count=2, seed="benchmark-weighted", weight_range=(1, 9)))
+    return puzzles
+
+def _peak_frontier(solver) -> int:
+    for attr in ("max_queue_size", "max_stack_size"):
+        if hasattr(solver, attr):
+            return getattr(solver, attr)
+    # Hill climbing keeps a single current state
+    return 1
+
+def _peak_rss_kb():
+    # Same RSS source as the solvers' memory_limit
+    peak = peak_rss()
+    return peak // 1024 if peak is not None else None
+
+def run_case(puzzle: Puzzle, solver_name: str, trials: int = 3, warmup: int = 1, max_nodes=None,
+             **options) -> dict:
+    """
+    Warm up, then time `trials` solves of one puzzle. Wall time is the fastest
+    trial (least disturbed by other load); the median is kept for reference.
+    Meant to run in a freshly spawned process so the peak RSS belongs to this
+    case alone (a forked worker would inherit the driver's footprint).
+    """
+    times = []
+    for trial in range(warmup + trials):
+        solver = SOLVERS[solver_name](puzzle.to_game(), max_nodes=max_nodes, **options)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            solution = solver.solve()
+        elapsed = time.perf_counter() - start
+        if trial >= warmup:
+            times.append(elapsed)
+
+    solved = solution is not None and solution.IsFinalState()
+    seconds = min(times)
+    return {
+        "status": "solved" if solved else solver.stop_reason or "unsolved",
+        "seconds": seconds,
+        "seconds_median": statistics.median(times),
+        "nodes": solver.visited_count,
+        "nodes_per_sec": solver.visited_count / seconds if seconds > 0 else 0.0,
+        "peak_frontier": _peak_frontier(solver),
+        "peak_rss_kb": _peak_rss_kb(),
+        "cost": solution.get_total_cost() if solved else None,
+        "stale_entries": solver.open_list.stale if hasattr(solver, "open_list") else None,
+    }
+
+def run_benchmark(puzzles, solvers=tuple(SOLVERS), trials: int = 3, warmup: int = 1, max_nodes=20000,
+                  **options) -> dict:
+    """Every solver on every puzzle, each case in its own spawned process; returns the baseline document"""
+    context = multiprocessing.get_context("spawn")
+    cases = {}
+    for puzzle in puzzles:
+        for solver_name in solvers:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                result = pool.submit(run_case, puzzle, solver_name, trials, warmup, max_nodes, **options).result()
+            key = f"{solver_name}/{puzzle.name}"
+            cases[key] = result
+            print(f"{key:40} {result['status']:>8} {result['seconds']:>9.4f}s {result['nodes']:>8,} nodes "
+                  f"{result['nodes_per_sec']:>10,.0f}/s frontier {result['peak_frontier']:>7,} "
+                  f"rss {result['peak_rss_kb']!s:>7}KB cost {result['cost']}")
+
+    return {
+        "version": BASELINE_VERSION,
+        "config": dict(options, trials=trials, warmup=warmup, max_nodes=max_nodes, solvers=list(solvers)),
+        "cases": cases,
+    }
+
+def find_regressions(baseline: dict, current: dict, threshold: float = 0.25, measured: bool = False,
+                     min_seconds: float = MIN_SECONDS) -> list:
+    """
+    Human-readable regressions of `current` against `baseline`: a lost
+    solution, a higher solution cost, or a deterministic metric worse by more
+    than `threshold` (relative). With `measured`, time, throughput and peak
+    RSS are compared too, the timings only where both runs took at least
+    min_seconds.
+    """
+    metrics = dict(DETERMINISTIC_METRICS, **MEASURED_METRICS) if measured else DETERMINISTIC_METRICS
+    regressions = []
+    for key, old in baseline["cases"].items():
+        new = current["cases"].get(key)
+        if new is None:
+            continue
+
+        if old["status"] == "solved" and new["status"] != "solved":
+            regressions.append(f"{key}: no longer solved ({new['status']})")
+            continue
+        if old["cost"] is not None and new["cost"] is not None and new["cost"] > old["cost"]:
+            regressions.append(f"{key}: cost {old['cost']} -> {new['cost']}")
+
+        for metric, higher_is_worse in metrics.items():
+            before, after = old.get(metric), new.get(metric)
+            if not before or after is None:
+                continue
+            if metric in ("seconds", "nodes_per_sec") and min(old["seconds"], new["seconds"]) < min_seconds:
+                continue
+            change = (after - before) / before
+            if (change if higher_is_worse else -change) > threshold:
+                spec = ".4f" if metric == "seconds" else ",.0f"
+                regressions.append(f"{key}: {metric} {before:{spec}} -> {after:{spec}} ({change:+.0%})")
+
+    return regressions
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark every solver and check for regressions")
+    parser.add_argument("--corpus", help="puzzle file to benchmark (default: built-in generated corpus)")
+    parser.add_argument("--solvers", default=",".join(SOLVERS), help="comma-separated solvers")
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--max-nodes", type=int, default=20000, help="node budget per solve")
+    parser.add_argument("--propagate", action="store_true")
+    parser.add_argument("--prune", action="store_true")
+    parser.add_argument("--most-constrained", action="store_true")
+    parser.add_argument("--backend", choices=("grid", "bitboard"), default="grid")
+    parser.add_argument("--save", help="write the results as a JSON baseline")
+    parser.add_argument("--baseline", help="JSON baseline to compare against; exit 1 on regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown (0.25 = 25%%)")
+    parser.add_argument("--measured", action="store_true",
+                        help="also gate on time, throughput and peak RSS (default: nodes, frontier, cost, status)")
+    parser.add_argument("--min-seconds", type=float, default=MIN_SECONDS,
+                        help="with --measured, compare timings only of cases at least this slow in both runs")
+    args = parser.parse_args(argv)
+
+    puzzles = list(read_puzzles(args.corpus)) if args.corpus else default_corpus()
+    current = run_benchmark(puzzles, args.solvers.split(","), args.trials, args.warmup, args.max_nodes,
+                            propagate=args.propagate, prune=args.prune,
+                            most_constrained=args.most_constrained, backend=args.backend)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(current, f, indent=2, sort_keys=True)
+        print(f"\nBaseline written to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != current["config"]:
+            print("\nWarning: baseline was recorded with a different configuration")
+        regressions = find_regressions(baseline, current, args.threshold, args.measured, args.min_seconds)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"\nNo regressions against {args.baseline}")
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
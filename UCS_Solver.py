@@ -1,28 +1,40 @@
 from Game import Game
 from BaseSolver import BaseSolver
+from NodeTable import NodeTable
+from OpenList import make_open_list
+from array import array
 from typing import Optional
-import heapq
 
 class UCS_Solver(BaseSolver):
     
-    def __init__(self, initial_game: Game, max_nodes=None):
-        super().__init__(initial_game, max_nodes)
+    supports_checkpoint = True
+    
+    def __init__(self, initial_game: Game, max_nodes=None, open_list="auto", **options):
+        super().__init__(initial_game, max_nodes, **options)
         self.max_queue_size = 0
+        # "bucket" (Dial's queue, integer weights), "heap" or "auto" (bucket when the weights allow it)
+        self.open_list_kind = open_list
+        self.open_list = make_open_list(open_list, self.initial_game.spec.weights)
+        self._best_cost = {}
     
     def solve(self) -> Optional[Game]:
         print("\nStarting UCS Search...")
         print(f"Board: {self.initial_game.board.rows}x{self.initial_game.board.cols}, Colors: {len(self.initial_game.board.positions)}")
         
-        self.visited_count = 0
+        self._start_budget()
         self.max_queue_size = 0
         self.solution_found = None
         self.solution_path = []
-        self.parent_map = {}
+        self.solution_moves = []
+        self.nodes = NodeTable()
+        self.open_list = make_open_list(self.open_list_kind, self.initial_game.spec.weights)
         
         self.initial_game.visited_states.clear()
         result = self._ucs_iterative()
         
-        print(f"\nUCS Complete: {self.visited_count:,} states visited, max queue: {self.max_queue_size:,}")
+        self._finish_progress()
+        print(f"\nUCS Complete: {self.visited_count:,} states visited, max queue: {self.max_queue_size:,}, "
+              f"stale entries skipped: {self.open_list.stale:,}")
         
         if result:
             print("Solution found!")
@@ -33,51 +45,76 @@ class UCS_Solver(BaseSolver):
             return None
     
     def _ucs_iterative(self) -> Optional[Game]:
-        priority_queue = []
-        counter = 0
-        
-        initial_cost = self.initial_game.get_total_cost()
-        heapq.heappush(priority_queue, (initial_cost, counter, self.initial_game))
-        counter += 1
+        open_list = self.open_list
+        self._frontier = open_list
         
-        self.initial_game.MarkAsVisited()
-        state_hash = self._hash_state(self.initial_game)
-        self.parent_map[state_hash] = None
-        
-        best_cost = {state_hash: initial_cost}
+        if self.resume:
+            self._restore_checkpoint()
+        else:
+            root, root_node = self._root()
+            if root is None:
+                return None
+            
+            initial_cost = root.get_total_cost()
+            open_list.push(initial_cost, 0, root, root_node)
+            
+            root.MarkAsVisited()
+            state_hash = self._hash_state(root)
+            
+            self._best_cost = {state_hash: initial_cost}
+        best_cost = self._best_cost
         
-        while priority_queue:
-            if self.visited_count >= self.max_nodes:
+        while open_list:
+            if self._budget_exhausted():
                 return None
             
-            if len(priority_queue) > self.max_queue_size:
-                self.max_queue_size = len(priority_queue)
+            if len(open_list) > self.max_queue_size:
+                self.max_queue_size = len(open_list)
             
-            current_cost, _, current_state = heapq.heappop(priority_queue)
+            current_cost, current_state, current_node = open_list.pop()
             self.visited_count += 1
+            self._track_best(current_state)
             
             if current_state.IsFinalState():
-                self.solution_found = current_state
-                self._reconstruct_path(current_state)
-                return current_state
+                return self._reconstruct_path(current_node)
             
             current_hash = self._hash_state(current_state)
             
             if current_cost > best_cost.get(current_hash, float('inf')):
+                open_list.discard()
                 continue
             
-            next_states = current_state.GetPossibleMoves()
-            
-            for next_state in next_states:
+            for move, next_state in self._expand(current_state):
                 next_hash = self._hash_state(next_state)
                 next_cost = next_state.get_total_cost()
                 
                 if next_cost < best_cost.get(next_hash, float('inf')):
                     best_cost[next_hash] = next_cost
                     next_state.MarkAsVisited()
-                    heapq.heappush(priority_queue, (next_cost, counter, next_state))
-                    counter += 1
-                    
-                    self.parent_map[next_hash] = current_state
+                    next_node = self._add_node(current_node, move)
+                    open_list.push(next_cost, 0, next_state, next_node)
         
-        return None
\ No newline at end of file
+        return None
+    
+    def _checkpoint_options(self) -> dict:
+        return dict(super()._checkpoint_options(), open_list=self.open_list.kind)
+    
+    def _checkpoint_state(self) -> tuple:
+        """Open list, best cost per state hash and the queue peak"""
+        open_meta, sections = self.open_list.checkpoint()
+        sections["best_cost.keys"] = array('Q', self._best_cost.keys())
+        sections["best_cost.values"] = array('d', self._best_cost.values())
+        return {"open_list": open_meta, "max_queue_size": self.max_queue_size}, sections
+    
+    def _load_checkpoint_state(self, meta: dict, reader):
+        self.open_list.restore(meta["open_list"], reader, self._unpack_states)
+        self._best_cost = dict(zip(reader.section("best_cost.keys"), reader.section("best_cost.values")))
+        self.max_queue_size = meta["max_queue_size"]
+    
+    def _progress_details(self) -> tuple:
+        """Frontier size, then cost (f = g) and depth of the cheapest frontier entry"""
+        queue = self._frontier
+        if not queue:
+            return 0, None, None, None
+        g_cost, _, node = queue.peek()
+        return len(queue), g_cost, g_cost, self.nodes.depth(node)
\ No newline at end of file
@@ -0,0 +1,114 @@
+import argparse
+import os
+import sys
+import time
+from BatchSolver import SOLVERS, solve_batch
+from PhaseProfiler import PhaseProfiler
+from PortfolioSolver import DEFAULT_PORTFOLIO, solve_portfolio_batch
+from PuzzleFile import read_puzzles, write_puzzles
+from SolutionCache import DEFAULT_MAX_ENTRIES, default_cache_path
+
+def solve_file(path: str, solver_name: str = "dfs", max_nodes=None, time_limit=None, workers=1,
+               output=None, portfolio=None, optimal=False, **options) -> tuple:
+    """
+    Solve every puzzle of a file, print one line per puzzle as it finishes; returns (solved, total).
+    With a portfolio (tuple of solver names) each puzzle is raced by those solvers instead.
+    """
+    solved = total = 0
+    results = []
+    start = time.time()
+
+    if portfolio:
+        batch = solve_portfolio_batch(read_puzzles(path), portfolio, optimal, max_nodes, time_limit, **options)
+    else:
+        batch = solve_batch(read_puzzles(path), solver_name, max_nodes, time_limit, workers, **options)
+
+    print(f"{'puzzle':20} {'size':>6} {'solver':>9} {'status':>8} {'cost':>8} {'known':>8} {'nodes':>10} {'time':>9}")
+    for result in batch:
+        puzzle = result.puzzle
+        total += 1
+        if result.solved:
+            solved += 1
+        if output:
+            results.append(result)
+
+        size = f"{puzzle.rows}x{puzzle.cols}"
+        status = "cached" if result.cached else result.status
+        print(f"{puzzle.name[:20]:20} {size:>6} {result.solver:>9} {status:>8} {result.cost!s:>8} "
+              f"{puzzle.solution_cost()!s:>8} {result.nodes:>10,} {result.seconds:>8.3f}s")
+        if result.error:
+            print(f"  {result.error}")
+
+    print(f"\n{solved}/{total} puzzles solved in {time.time() - start:.3f}s")
+
+    if output:
+        results.sort(key=lambda result: result.index)
+        write_puzzles(output, (result.solved_puzzle() for result in results))
+        print(f"Solutions written to {output}")
+
+    return solved, total
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Solve every puzzle of a puzzle file without prompts")
+    parser.add_argument("path", help="puzzle file (JSON Lines text or .nlb binary)")
+    parser.add_argument("--solver", choices=sorted(SOLVERS), default="dfs")
+    parser.add_argument("--max-nodes", type=int, default=None, help="node budget per puzzle")
+    parser.add_argument("--time-limit", type=float, default=None, help="seconds per puzzle")
+    parser.add_argument("--memory-limit", type=float, default=None, help="resident memory ceiling per solve, in MB")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (0 = one per core)")
+    parser.add_argument("--portfolio", nargs="?", const=",".join(DEFAULT_PORTFOLIO), default=None,
+                        help="race comma-separated solvers in parallel on each puzzle (default: %(const)s)")
+    parser.add_argument("--optimal", action="store_true", help="with --portfolio, only accept proven-optimal solutions")
+    parser.add_argument("--propagate", action="store_true", help="apply forced moves")
+    parser.add_argument("--prune", action="store_true", help="drop states with unreachable ends")
+    parser.add_argument("--most-constrained", action="store_true", help="branch on the most constrained color")
+    parser.add_argument("--backend", choices=("grid", "bitboard"), default="grid")
+    parser.add_argument("--profile", metavar="PREFIX",
+                        help="time solver phases, write PREFIX.json and PREFIX.folded (single process only)")
+    parser.add_argument("--checkpoint-dir", metavar="DIR",
+                        help="checkpoint each search to DIR and resume from it on the next run (bfs, ucs, astar)")
+    parser.add_argument("--checkpoint-every", type=int, default=100000, help="expanded nodes between checkpoints")
+    parser.add_argument("--cache", nargs="?", const=default_cache_path(), default=None, metavar="PATH",
+                        help="answer repeated puzzles (also rotated, mirrored or recolored) from a solution cache "
+                             "and add new solutions to it (default: %(const)s)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_ENTRIES,
+                        help="most solutions kept in the cache, least recently used evicted first")
+    parser.add_argument("--output", help="write puzzles with the solutions found (.nlb for binary)")
+    args = parser.parse_args(argv)
+
+    profiler = None
+    if args.profile:
+        if args.workers != 1 or args.portfolio:
+            parser.error("--profile needs --workers 1 and no --portfolio")
+        profiler = PhaseProfiler()
+
+    checkpoints = {}
+    if args.checkpoint_dir:
+        if args.portfolio:
+            parser.error("--checkpoint-dir cannot be combined with --portfolio")
+        if not SOLVERS[args.solver].supports_checkpoint:
+            parser.error(f"--checkpoint-dir is not supported by the {args.solver} solver")
+        os.makedirs(args.checkpoint_dir, exist_ok=True)
+        checkpoints = {"checkpoint_dir": args.checkpoint_dir, "checkpoint_every": args.checkpoint_every}
+
+    cache = {}
+    if args.cache:
+        if args.cache_size < 1:
+            parser.error("--cache-size must be at least 1")
+        cache = {"cache_path": args.cache, "cache_size": args.cache_size}
+
+    solved, total = solve_file(args.path, args.solver, args.max_nodes, args.time_limit, args.workers or None,
+                               args.output, args.portfolio.split(",") if args.portfolio else None,
+                               args.optimal, propagate=args.propagate, prune=args.prune,
+                               most_constrained=args.most_constrained, backend=args.backend,
+                               memory_limit=args.memory_limit, profiler=profiler, **checkpoints, **cache)
+
+    if profiler is not None:
+        profiler.print_report()
+        profiler.write_json(f"{args.profile}.json")
+        profiler.write_collapsed(f"{args.profile}.folded")
+        print(f"\nProfile written to {args.profile}.json and {args.profile}.folded")
+    return 0 if solved == total else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
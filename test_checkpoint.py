@@ -0,0 +1,31 @@
+import pytest
+
+from AStar_Solver import AStar_Solver
+from BFS_Solver import BFS_Solver
+from PuzzleGenerator import generate_puzzle
+from UCS_Solver import UCS_Solver
+
+
+@pytest.mark.parametrize("solver_class", [BFS_Solver, UCS_Solver, AStar_Solver])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_resumed_solution_matches_uninterrupted(tmp_path, solver_class, seed):
+    puzzle = generate_puzzle(4, 4, 3, seed=seed, weight_range=(1, 9))
+    full = solver_class(puzzle.to_game(), max_nodes=20000)
+    expected = full.solve()
+    assert expected is not None and expected.IsFinalState()
+
+    checkpoint = str(tmp_path / "search.nlck")
+    interrupted = solver_class(puzzle.to_game(), max_nodes=max(2, full.visited_count // 2), checkpoint=checkpoint)
+    assert interrupted.solve() is None
+    assert interrupted.stop_reason == "nodes"
+
+    resumed = solver_class(puzzle.to_game(), max_nodes=20000, resume=checkpoint)
+    solution = resumed.solve()
+    assert solution is resumed.solution_found
+    assert solution.paths == expected.paths
+    assert solution.get_total_cost() == expected.get_total_cost()
+    # The paths themselves, not only the final state's counters, carry the whole cost
+    weights = puzzle.weights or [1.0] * (puzzle.rows * puzzle.cols)
+    path_cost = sum(weights[row * puzzle.cols + col] for path in solution.paths.values() for row, col in path[1:])
+    assert path_cost == expected.get_total_cost()
+    assert resumed.visited_count == full.visited_count
@@ -0,0 +1,44 @@
+import random
+
+import pytest
+
+from BitboardGame import BitboardGame
+from PuzzleGenerator import generate_puzzle
+
+
+def _random_children(seed: int, walks: int = 40):
+    """(parent, child, color, cell) for every move out of states along random walks that avoid dead ends"""
+    rng = random.Random(seed)
+    puzzle = generate_puzzle(6, 6, 5, seed=seed)
+    for _ in range(walks):
+        state = puzzle.to_game()
+        while not state.IsFinalState():
+            moves = state.GetLegalMoves()
+            alive = []
+            for color, cell, cost in moves:
+                child = state.CopyState()
+                child.ApplyMove(color, cell, cost)
+                yield state, child, color, cell
+                if not child.IsDeadEnd():
+                    alive.append(child)
+            if not alive:
+                break
+            state = rng.choice(alive)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_incremental_check_matches_full_check(seed):
+    checked = 0
+    for parent, child, color, cell in _random_children(seed):
+        assert not parent.IsDeadEnd()
+        assert child.IsDeadEndAfterMove(color, cell) == child.IsDeadEnd()
+        checked += 1
+    assert checked > 500
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_backends_agree_on_dead_ends(seed):
+    for _, child, color, cell in _random_children(seed, walks=10):
+        bitboard = BitboardGame.from_game(child)
+        assert bitboard.IsDeadEnd() == child.IsDeadEnd()
+        assert bitboard.IsDeadEndAfterMove(color, cell) == child.IsDeadEnd()
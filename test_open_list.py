@@ -0,0 +1,32 @@
+import pytest
+
+from AStar_Solver import AStar_Solver
+from OpenList import BucketOpenList, HeapOpenList, make_open_list
+from PuzzleGenerator import generate_puzzle
+from UCS_Solver import UCS_Solver
+
+
+def test_auto_picks_bucket_for_integer_weights():
+    assert isinstance(make_open_list("auto", [1, 2, 3.0]), BucketOpenList)
+    assert isinstance(make_open_list("auto", [1, 2, 100]), HeapOpenList)
+
+
+def test_fractional_weights_pick_heap():
+    assert isinstance(make_open_list("auto", [1, 0.5, 2.5]), HeapOpenList)
+    with pytest.raises(ValueError):
+        make_open_list("bucket", [1, 0.5, 2.5])
+
+
+@pytest.mark.parametrize("solver_class", [UCS_Solver, AStar_Solver])
+def test_solver_keeps_fractional_weights(solver_class):
+    puzzle = generate_puzzle(4, 4, 3, seed=1)
+    puzzle.weights = [0.5, 2.5] * 8
+    solver = solver_class(puzzle.to_game())
+    assert solver.initial_game.spec.weights[:2] == (0.5, 2.5)
+    assert solver.open_list.kind == "heap"
+
+    solution = solver.solve()
+    weights = puzzle.weights
+    path_cost = sum(weights[row * puzzle.cols + col] for path in solution.paths.values() for row, col in path[1:])
+    assert solution.get_total_cost() == path_cost
+    assert path_cost <= puzzle.solution_cost()
@@ -0,0 +1,54 @@
+import pytest
+
+from PuzzleFile import Puzzle, read_puzzles, write_puzzles
+from PuzzleGenerator import generate_puzzle
+
+
+def _corpus() -> list:
+    unit = generate_puzzle(5, 5, 4, seed=0, name="unit")
+    weighted = generate_puzzle(4, 6, 3, seed=1, weight_range=(0, 9), name="weighted")
+    # f32-exact fractional weights, and no known solution
+    fractional = generate_puzzle(4, 4, 3, seed=2, name="fractional")
+    fractional.weights = [0.5, 1.25, 2.5, 3] * 4
+    fractional.solution = None
+    return [unit, weighted, fractional]
+
+
+def _fields(puzzle: Puzzle) -> tuple:
+    return puzzle.name, puzzle.rows, puzzle.cols, puzzle.endpoints, puzzle.weights, puzzle.solution
+
+
+@pytest.mark.parametrize("extension", [".jsonl", ".nlb"])
+def test_round_trip(tmp_path, extension):
+    puzzles = _corpus()
+    path = str(tmp_path / f"puzzles{extension}")
+    assert write_puzzles(path, puzzles) == len(puzzles)
+
+    loaded = list(read_puzzles(path))
+    assert [_fields(puzzle) for puzzle in loaded] == [_fields(puzzle) for puzzle in puzzles]
+    assert [puzzle.solution_cost() for puzzle in loaded] == [puzzle.solution_cost() for puzzle in puzzles]
+
+
+def test_formats_agree_and_keep_weights_on_the_board(tmp_path):
+    text, binary = str(tmp_path / "puzzles.jsonl"), str(tmp_path / "puzzles.nlb")
+    write_puzzles(text, _corpus())
+    write_puzzles(binary, read_puzzles(text))
+    with open(binary, "rb") as f:
+        assert f.read(4) == b"NLPZ"
+
+    for from_text, from_binary in zip(read_puzzles(text), read_puzzles(binary)):
+        assert _fields(from_text) == _fields(from_binary)
+        # The board a solver gets keeps fractional weights, and from_board gives back the same puzzle
+        board = from_binary.to_board()
+        assert Puzzle.from_board(board, from_binary.name, from_binary.solution).to_dict() == from_binary.to_dict()
+
+
+def test_truncated_binary_record_is_rejected(tmp_path):
+    path = str(tmp_path / "puzzles.nlb")
+    write_puzzles(path, _corpus()[:1])
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data[:-3])
+    with pytest.raises(ValueError, match="truncated"):
+        list(read_puzzles(path))
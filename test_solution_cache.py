@@ -0,0 +1,98 @@
+import contextlib
+import io
+
+import pytest
+
+from AStar_Solver import AStar_Solver
+from PuzzleFile import Puzzle
+from PuzzleGenerator import generate_puzzle
+from SolutionCache import SolutionCache
+
+
+def _rotate(puzzle: Puzzle) -> Puzzle:
+    """Quarter turn clockwise: (row, col) of a rows x cols board goes to (col, rows - 1 - row)"""
+    rows, cols = puzzle.rows, puzzle.cols
+
+    def move(cell):
+        return cell[1], rows - 1 - cell[0]
+
+    endpoints = {color: (move(start), move(end)) for color, (start, end) in puzzle.endpoints.items()}
+    weights = None
+    if puzzle.weights is not None:
+        weights = [0] * (rows * cols)
+        for cell, weight in enumerate(puzzle.weights):
+            row, col = move(divmod(cell, cols))
+            weights[row * rows + col] = weight
+    return Puzzle(cols, rows, endpoints, weights)
+
+
+def _mirror(puzzle: Puzzle) -> Puzzle:
+    rows, cols = puzzle.rows, puzzle.cols
+
+    def move(cell):
+        return cell[0], cols - 1 - cell[1]
+
+    endpoints = {color: (move(start), move(end)) for color, (start, end) in puzzle.endpoints.items()}
+    weights = None
+    if puzzle.weights is not None:
+        weights = [puzzle.weights[row * cols + cols - 1 - col] for row in range(rows) for col in range(cols)]
+    return Puzzle(rows, cols, endpoints, weights)
+
+
+def _symmetries(puzzle: Puzzle) -> list:
+    result = []
+    for base in (puzzle, _mirror(puzzle)):
+        for _ in range(4):
+            result.append(base)
+            base = _rotate(base)
+    return result
+
+
+def _recolor(puzzle: Puzzle, colors: list) -> Puzzle:
+    endpoints = {new: puzzle.endpoints[old] for old, new in zip(puzzle.endpoints, colors)}
+    return Puzzle(puzzle.rows, puzzle.cols, endpoints, puzzle.weights)
+
+
+def _replayed_cost(puzzle: Puzzle, moves: list) -> float:
+    """Cost of `moves` played on `puzzle`, asserting every one is legal and the result is solved"""
+    game = puzzle.to_game()
+    for color, cell, cost in moves:
+        assert (color, cell) in [(move[0], move[1]) for move in game.GetColorMoves(color)]
+        game.ApplyMove(color, cell, cost)
+    assert game.IsFinalState()
+    return game.get_total_cost()
+
+
+@pytest.fixture
+def solved(tmp_path):
+    """A weighted, non-square puzzle, its A* cost and a cache holding its solution"""
+    puzzle = generate_puzzle(4, 5, 3, seed=2, weight_range=(1, 9))
+    solver = AStar_Solver(puzzle.to_game())
+    with contextlib.redirect_stdout(io.StringIO()):
+        solution = solver.solve()
+    cache = SolutionCache(str(tmp_path / "solutions.sqlite"))
+    assert cache.put(puzzle, solver.solution_moves, "astar", solution.get_total_cost(), True)
+    yield puzzle, solution.get_total_cost(), cache
+    cache.close()
+
+
+def test_symmetric_and_recolored_copies_hit(solved):
+    puzzle, cost, cache = solved
+    copies = _symmetries(puzzle)
+    assert len({(copy.rows, copy.cols) for copy in copies}) == 2
+    for copy in copies:
+        for colors in ([1, 2, 3], [9, 4, 200]):
+            recolored = _recolor(copy, colors)
+            hit = cache.get(recolored, require_optimal=True)
+            assert hit is not None
+            assert hit.cost == cost
+            assert _replayed_cost(recolored, hit.moves) == cost
+            for color, (start, end) in recolored.endpoints.items():
+                assert hit.paths[color][0] == tuple(start) and hit.paths[color][-1] == tuple(end)
+
+
+def test_different_weights_miss(solved):
+    puzzle, _, cache = solved
+    weights = list(puzzle.weights)
+    weights[0] += 1
+    assert cache.get(Puzzle(puzzle.rows, puzzle.cols, puzzle.endpoints, weights)) is None